@@ -0,0 +1,48 @@
+"""
+Per call cost of resolving the caller's file name with caller_file_name against inspect.stack().
+
+Usage:
+- poetry run python benchmarks/bench_caller.py [stack depth ...]
+"""
+
+import inspect
+import os
+import sys
+import timeit
+
+from pyutils.frames import caller_file_name
+
+
+def with_inspect_stack() -> str:
+    """How get_logger() and title() resolved the caller's file name before caller_file_name."""
+    return os.path.basename(inspect.stack()[1].filename)
+
+
+def with_caller_file_name() -> str:
+    return caller_file_name()
+
+
+def nested(func, depth: int) -> str:
+    """Call func below `depth` extra frames, as inside a framework."""
+    if depth == 0:
+        return func()
+    return nested(func, depth - 1)
+
+
+def seconds_per_call(func, depth: int, number: int) -> float:
+    return timeit.timeit(lambda: nested(func, depth), number=number) / number
+
+
+def main(*depths: int) -> None:
+    print(f"Python {sys.version.split()[0]}")
+    for depth in depths or (0, 50):
+        # the frames of nested() itself cost the same for both
+        overhead = seconds_per_call(lambda: None, depth, 100_000)
+        before = seconds_per_call(with_inspect_stack, depth, 200) - overhead
+        after = seconds_per_call(with_caller_file_name, depth, 100_000) - overhead
+        print(f"stack depth {depth:4d}: inspect.stack {before * 1e6:10.2f} us -> caller_file_name "
+              f"{after * 1e6:8.3f} us per call")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
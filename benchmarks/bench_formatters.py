@@ -0,0 +1,65 @@
+"""
+Records per second of the pyutils log formatters against the implementation they replaced.
+
+Usage:
+- poetry run python benchmarks/bench_formatters.py [number of records]
+"""
+
+import logging
+import sys
+import time
+
+from pyutils.logger import ColorizingFormatter, IndentMultilineFormatter
+
+FMT = "%(asctime)s-%(name)s-%(levelname)s: %(message)s"
+DATEFMT = "%Y-%m-%dT%H:%M:%S"
+
+
+class BaselineIndentMultilineFormatter(logging.Formatter):
+    """IndentMultilineFormatter before the prefix and timestamp caching."""
+
+    def format(self, record):
+        original = super().format(record)
+        if '\n' not in record.getMessage():
+            return original
+        msg = record.getMessage()
+        prefix = original.split(msg, 1)[0]
+        indent = ' ' * len(prefix)
+        lines = original.split('\n')
+        return '\n'.join([lines[0]] + [indent + line for line in lines[1:]])
+
+
+class BaselineColorizingFormatter(BaselineIndentMultilineFormatter):
+    """ColorizingFormatter before the prefix and timestamp caching."""
+
+    def format(self, record):
+        msg = super().format(record)
+        color = ColorizingFormatter.COLORS.get(record.levelname, ColorizingFormatter.RESET)
+        return f"{color}{msg}{ColorizingFormatter.RESET}"
+
+
+def records_per_second(formatter: logging.Formatter, records: list[logging.LogRecord]) -> float:
+    start = time.perf_counter()
+    for record in records:
+        formatter.format(record)
+    return len(records) / (time.perf_counter() - start)
+
+
+def main(count: int = 200_000) -> None:
+    print(f"Python {sys.version.split()[0]}, {count} records per run")
+    pairs = [
+        ("IndentMultilineFormatter", BaselineIndentMultilineFormatter, IndentMultilineFormatter),
+        ("ColorizingFormatter", BaselineColorizingFormatter, ColorizingFormatter),
+    ]
+    for message in ("single line message", "multi\nline\nmessage"):
+        records = [logging.LogRecord("app.module", logging.INFO, __file__, 1, message, None, None)
+                   for _ in range(count)]
+        kind = "multiline" if "\n" in message else "single line"
+        for name, baseline, current in pairs:
+            before = records_per_second(baseline(FMT, datefmt=DATEFMT), records)
+            after = records_per_second(current(FMT, datefmt=DATEFMT), records)
+            print(f"{name:26s} {kind:12s} {before:12,.0f} -> {after:12,.0f} records/s ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -1,33 +1,93 @@
-from .dicts import merge_dicts, has_empty_leaves
+from .dicts import (
+    merge_dicts,
+    merged_dicts,
+    diff_dicts,
+    apply_dict_patch,
+    has_empty_leaves,
+    LeafIndex,
+    LayeredDict,
+    dict_fingerprint,
+    memoize_dicts,
+)
 from .clock import (
     extract_iso_date,
     get_current_date_and_time_str,
     get_current_date_str,
     get_current_time_str,
+    CoarseClock,
     parse_iso_date,
+    parse_iso_dates,
     localize_naive_datetimes,
     convert_local_datetimes_to_utc,
-    make_naive_df_timezone_aware
+    localize_naive_datetime64,
+    convert_utc_datetime64_to_local,
+    make_naive_df_timezone_aware,
+    iter_naive_lf_timezone_aware,
+)
+from .catalog import DatedFileCatalog
+from .vectors import (
+    detect_vector_interpolation,
+    detect_vector_interpolation_batch,
+    detect_vector_interpolation_chunked,
+    InterpolationDetector,
+    scan_vector_quality,
 )
-from .vectors import detect_vector_interpolation
+from .frames import caller_file_name
 from .markers import title, subtitle, marker_line
-from .logger import get_logger, setup_root_logger
+from .logger import (
+    get_logger,
+    setup_root_logger,
+    setup_worker_logger,
+    worker_logger_initargs,
+    JsonLinesFormatter,
+    JsonLinesFileHandler,
+    RateLimitFilter,
+)
+from .timing import (
+    LatencyHistogram,
+    Timer,
+    timed,
+    get_histogram,
+    configure_timing,
+    report_timings,
+    reset_timings,
+)
 
 __all__ = [
     # dicts
     "merge_dicts",
+    "merged_dicts",
+    "diff_dicts",
+    "apply_dict_patch",
     "has_empty_leaves",
+    "LeafIndex",
+    "LayeredDict",
+    "dict_fingerprint",
+    "memoize_dicts",
     # time
     "extract_iso_date",
     "get_current_date_and_time_str",
     "get_current_date_str",
     "get_current_time_str",
+    "CoarseClock",
     "parse_iso_date",
+    "parse_iso_dates",
     "localize_naive_datetimes",
     "convert_local_datetimes_to_utc",
+    "localize_naive_datetime64",
+    "convert_utc_datetime64_to_local",
     "make_naive_df_timezone_aware",
+    "iter_naive_lf_timezone_aware",
+    # catalog
+    "DatedFileCatalog",
     # vector
     "detect_vector_interpolation",
+    "detect_vector_interpolation_batch",
+    "detect_vector_interpolation_chunked",
+    "InterpolationDetector",
+    "scan_vector_quality",
+    # frames
+    "caller_file_name",
     # markers
     "title",
     "subtitle",
@@ -35,5 +95,18 @@ __all__ = [
     # logger
     "get_logger",
     "setup_root_logger",
+    "setup_worker_logger",
+    "worker_logger_initargs",
+    "JsonLinesFormatter",
+    "JsonLinesFileHandler",
+    "RateLimitFilter",
+    # timing
+    "LatencyHistogram",
+    "Timer",
+    "timed",
+    "get_histogram",
+    "configure_timing",
+    "report_timings",
+    "reset_timings",
 
 ]
@@ -0,0 +1,155 @@
+"""
+Date indexed catalog of files in a directory tree.
+
+Usage:
+- catalog = DatedFileCatalog("exports/") scans the tree once and indexes every file with a date in its name
+- catalog.between("2024-01-01", "2024-01-31") returns the paths dated within a range
+- catalog.latest(3) returns the paths of the 3 most recently dated files
+- catalog.refresh() picks up changes, only listing directories whose modification time changed
+"""
+
+import os
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Callable
+from datetime import date
+from operator import itemgetter
+
+from pyutils.clock import ISO_DATE_PATTERN, extract_iso_date, parse_iso_date
+
+__all__ = ["DatedFileCatalog"]
+
+_entry_date = itemgetter(0)
+# above this many changed files a refresh rebuilds the index instead of updating it entry by entry
+_INCREMENTAL_UPDATE_LIMIT = 256
+
+
+class DatedFileCatalog:
+    """
+    Keeps a sorted (date, path) index of the files below `root` whose name contains a date.
+
+    Every directory remembers its modification time, its dated files and its subdirectories. Adding, removing or
+    renaming a file changes the modification time of its directory, so a refresh only lists those directories again.
+    Subdirectories of unchanged directories are still visited, but not listed unless they changed themselves.
+    """
+
+    def __init__(self,
+                 root: str,
+                 pattern: str = ISO_DATE_PATTERN,
+                 parse_date: Callable[[str], date] = parse_iso_date,
+                 recursive: bool = True):
+        self.root = root
+        self.pattern = pattern
+        self.parse_date = parse_date
+        self.recursive = recursive
+        self._index: list[tuple[date, str]] = []
+        # directory path -> (mtime in ns, dated files, subdirectories)
+        self._directories: dict[str, tuple[int, list[tuple[date, str]], list[str]]] = {}
+        # changes collected during a refresh, applied to the index at the end of it
+        self._added: list[tuple[date, str]] = []
+        self._removed: list[tuple[date, str]] = []
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _date_of(self, file_name: str) -> date | None:
+        """Return the date in a file name, or None if it has no (valid) date."""
+        date_str = extract_iso_date(file_name, self.pattern)
+        if date_str is None:
+            return None
+        try:
+            return self.parse_date(date_str)
+        except ValueError:
+            return None
+
+    def _scan_directory(self, path: str, mtime_ns: int) -> list[str]:
+        """List a directory, stage the changes of its dated files and return its subdirectories."""
+        entries = []
+        subdirectories = []
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                elif entry.is_file():
+                    file_date = self._date_of(entry.name)
+                    if file_date is not None:
+                        entries.append((file_date, entry.path))
+
+        self._forget_entries(path)
+        self._added.extend(entries)
+        self._directories[path] = (mtime_ns, entries, subdirectories)
+        return subdirectories
+
+    def _forget_entries(self, path: str) -> None:
+        """Stage the removal of the dated files of a known directory."""
+        if path in self._directories:
+            self._removed.extend(self._directories[path][1])
+
+    def _forget_directory(self, path: str) -> None:
+        """Drop a directory that no longer exists, together with all its known subdirectories."""
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            if current not in self._directories:
+                continue
+            stack.extend(self._directories[current][2])
+            self._forget_entries(current)
+            del self._directories[current]
+
+    def _apply_changes(self) -> None:
+        """Apply the staged removals and additions to the sorted index."""
+        if len(self._added) + len(self._removed) <= _INCREMENTAL_UPDATE_LIMIT:
+            for entry in self._removed:
+                position = bisect_left(self._index, entry)
+                if position < len(self._index) and self._index[position] == entry:
+                    del self._index[position]
+            for entry in self._added:
+                insort(self._index, entry)
+        else:
+            # a single filter and sort of the mostly sorted list beats many insertions
+            removed = set(self._removed)
+            self._index = [entry for entry in self._index if entry not in removed]
+            self._index.extend(self._added)
+            self._index.sort()
+        self._added = []
+        self._removed = []
+
+    def refresh(self) -> None:
+        """Bring the index up to date, only listing the directories whose modification time changed."""
+        stack = [self.root]
+        while stack:
+            path = stack.pop()
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                self._forget_directory(path)
+                continue
+
+            known = self._directories.get(path)
+            if known is not None and known[0] == mtime_ns:
+                subdirectories = known[2]
+            else:
+                previous_subdirectories = known[2] if known is not None else []
+                subdirectories = self._scan_directory(path, mtime_ns)
+                for removed in set(previous_subdirectories) - set(subdirectories):
+                    self._forget_directory(removed)
+
+            if self.recursive:
+                stack.extend(subdirectories)
+        self._apply_changes()
+
+    def between(self, start: date | str, end: date | str) -> list[str]:
+        """Return the paths of the files dated from `start` up to and including `end`, sorted by date."""
+        if isinstance(start, str):
+            start = parse_iso_date(start)
+        if isinstance(end, str):
+            end = parse_iso_date(end)
+        low = bisect_left(self._index, start, key=_entry_date)
+        high = bisect_right(self._index, end, key=_entry_date)
+        return [path for _, path in self._index[low:high]]
+
+    def latest(self, n: int = 1) -> list[str]:
+        """Return the paths of the `n` most recently dated files, most recent first."""
+        if n <= 0:
+            return []
+        return [path for _, path in reversed(self._index[-n:])]
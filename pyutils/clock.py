@@ -1,7 +1,11 @@
+from collections.abc import Iterator
 from datetime import datetime, tzinfo, timezone
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 import re
+import time
 
+import numpy as np
 import polars as pl
 
 __all__ = [
@@ -9,19 +13,42 @@ __all__ = [
     "get_current_date_and_time_str",
     "get_current_date_str",
     "get_current_time_str",
+    "CoarseClock",
     "parse_iso_date",
+    "parse_iso_dates",
     "localize_naive_datetimes",
     "convert_local_datetimes_to_utc",
+    "localize_naive_datetime64",
+    "convert_utc_datetime64_to_local",
     "make_naive_df_timezone_aware",
+    "iter_naive_lf_timezone_aware",
 ]
 
 LOCAL_TZ = ZoneInfo("Europe/Brussels")
-
-def extract_iso_date(text: str, pattern: str = r'\d{4}-\d{2}-\d{2}') -> str | None:
+ISO_DATE_PATTERN = r'\d{4}-\d{2}-\d{2}'
+# what strptime accepts for "%Y-%m-%d": 4 digit years except 0000, 1-2 digit months, and 1-2 digit days that may be
+# space padded (no lookaheads, polars' regex engine does not support them)
+_STRPTIME_ISO_DATE_PATTERN = (r'^(?:[1-9]\d{3}|\d[1-9]\d{2}|\d{2}[1-9]\d|\d{3}[1-9])'
+                              r'-(?:1[0-2]|0[1-9]|[1-9])-(?:3[01]|[12]\d|0[1-9]|[1-9]| [1-9])$')
+
+# range covered by the precomputed zone transition tables, outside of it the nearest known offset is used
+TRANSITION_TABLE_START = datetime(1900, 1, 1, tzinfo=timezone.utc)
+TRANSITION_TABLE_END = datetime(2200, 1, 1, tzinfo=timezone.utc)
+
+_SECONDS_PER_DAY = 86400
+_EPOCH_UNITS_PER_SECOND = {"s": 1, "ms": 1_000, "us": 1_000_000, "ns": 1_000_000_000}
+_NAT = np.iinfo(np.int64).min
+
+@lru_cache(maxsize=64)
+def _compile_pattern(pattern: str) -> re.Pattern:
+    """Compile a regular expression once and reuse it on subsequent calls."""
+    return re.compile(pattern)
+
+def extract_iso_date(text: str, pattern: str = ISO_DATE_PATTERN) -> str | None:
     # define iso date pattern
-    iso_date_pattern = re.compile(pattern)
+    iso_date_pattern = _compile_pattern(pattern)
     # Define the regular expression to match the ISO date
-    match = re.search(iso_date_pattern, text)
+    match = iso_date_pattern.search(text)
     # Check if match is found and return the matched string
     if match:
         return match.group(0)
@@ -31,8 +58,9 @@ def extract_iso_date(text: str, pattern: str = r'\d{4}-\d{2}-\d{2}') -> str | No
 def get_current_date_and_time_str(date_format: str,
                                   time_format: str,
                                   tz: tzinfo = LOCAL_TZ) -> tuple[str, str]:
-    """Return the current date and time as a tuple of strings formatted as desired."""
-    return (get_current_date_str(date_format, tz), get_current_time_str(time_format, tz))
+    """Return the current date and time as a tuple of strings formatted as desired, from a single clock read."""
+    now_datetime = datetime.now(tz)
+    return (now_datetime.strftime(date_format), now_datetime.strftime(time_format))
 
 def get_current_date_str(date_format: str,
                          tz: tzinfo = LOCAL_TZ) -> str:
@@ -46,6 +74,72 @@ def get_current_time_str(time_format: str,
     now_datetime = datetime.now(tz)
     return now_datetime.strftime(time_format)
 
+class CoarseClock:
+    """
+    A clock with a configurable resolution that caches its formatted strings, for per-record time stamping.
+
+    The clock is read once per call, truncated to `resolution` seconds, and strings are only rendered again when
+    that truncated time changes (time formats) or when the day changes (date formats).
+    Example:
+        clock = CoarseClock()
+        date_str, time_str = clock.get_date_and_time_str("%Y-%m-%d", "%H:%M:%S")
+    """
+
+    def __init__(self, tz: tzinfo = LOCAL_TZ, resolution: float = 1.0):
+        if resolution <= 0:
+            raise ValueError(f"resolution must be positive. Found: {resolution}")
+        self.tz = tz
+        self.resolution = resolution
+        # (tick, datetime of the start of that tick)
+        self._current: tuple[int, datetime] | None = None
+        # format -> (tick or day ordinal it was rendered for, rendered string)
+        self._time_strs: dict[str, tuple[int, str]] = {}
+        self._date_strs: dict[str, tuple[int, str]] = {}
+
+    def _read(self) -> tuple[int, datetime]:
+        """Read the clock once and return the current tick and its datetime."""
+        tick = int(time.time() // self.resolution)
+        current = self._current
+        if current is None or current[0] != tick:
+            current = (tick, datetime.fromtimestamp(tick * self.resolution, self.tz))
+            self._current = current
+        return current
+
+    def _time_str(self, current: tuple[int, datetime], time_format: str) -> str:
+        """Render a time format for the given tick, reusing the string rendered earlier during the same tick."""
+        tick, now_datetime = current
+        cached = self._time_strs.get(time_format)
+        if cached is None or cached[0] != tick:
+            cached = (tick, now_datetime.strftime(time_format))
+            self._time_strs[time_format] = cached
+        return cached[1]
+
+    def _date_str(self, current: tuple[int, datetime], date_format: str) -> str:
+        """Render a date format for the given tick, reusing the string rendered earlier during the same day."""
+        day = current[1].toordinal()
+        cached = self._date_strs.get(date_format)
+        if cached is None or cached[0] != day:
+            cached = (day, current[1].strftime(date_format))
+            self._date_strs[date_format] = cached
+        return cached[1]
+
+    def now(self) -> datetime:
+        """Return the current time, truncated to the resolution of the clock."""
+        return self._read()[1]
+
+    def get_date_str(self, date_format: str) -> str:
+        """Return the current date as a string formatted as desired. The format must not contain time fields."""
+        return self._date_str(self._read(), date_format)
+
+    def get_time_str(self, time_format: str) -> str:
+        """Return the current time as a string formatted as desired."""
+        return self._time_str(self._read(), time_format)
+
+    def get_date_and_time_str(self, date_format: str, time_format: str) -> tuple[str, str]:
+        """Return the current date and time as a tuple of strings formatted as desired, from a single clock read."""
+        current = self._read()
+        return (self._date_str(current, date_format), self._time_str(current, time_format))
+
 def parse_iso_date(date_str: str) -> datetime.date:
     """Parses an ISO date string (YYYY-M-D or YYYY-MM-DD) to a date object."""
     try:
@@ -53,6 +147,46 @@ def parse_iso_date(date_str: str) -> datetime.date:
     except ValueError:
         raise ValueError(f"Invalid date format: {date_str}")
 
+def parse_iso_dates(
+        date_strs: list[str | None] | np.ndarray | pl.Series,
+        errors: str = "mask"
+) -> tuple[np.ndarray, np.ndarray] | tuple[pl.Series, pl.Series]:
+    """
+    Bulk counterpart of `parse_iso_date`, parsing ISO date strings (YYYY-M-D or YYYY-MM-DD) in one vectorized pass.
+
+    Args:
+        date_strs (list[str | None] | np.ndarray | pl.Series): The date strings. None/null elements stay missing
+            and are not considered invalid.
+        errors (str): "mask" to report invalid elements through the returned mask, or "raise" to raise a single
+            ValueError listing all invalid elements. Default is "mask".
+
+    Returns:
+        tuple: A tuple containing:
+            - np.ndarray | pl.Series: The parsed dates, a `datetime64[D]` array (NaT for missing or invalid elements),
+                                      or a `pl.Date` Series if a Series was given (null for missing or invalid elements).
+            - np.ndarray | pl.Series: A boolean mask, True where a non-missing element is not a valid date.
+    """
+    if errors not in ("mask", "raise"):
+        raise ValueError(f"errors must be 'mask' or 'raise'. Found: {errors}")
+    as_series = isinstance(date_strs, pl.Series)
+    series = date_strs if as_series else pl.Series(values=date_strs)
+    if series.dtype not in (pl.String, pl.Null):
+        raise TypeError(f"Expected date strings. Found: {series.dtype}")
+
+    # the regular expression mirrors what strptime accepts for "%Y-%m-%d", which is stricter than polars' parser
+    date_str = series.cast(pl.String)
+    dates = date_str.to_frame("date_str").select(
+        pl.when(pl.col("date_str").str.contains(_STRPTIME_ISO_DATE_PATTERN))
+        .then(pl.col("date_str").str.to_date("%Y-%m-%d", strict=False))
+    ).to_series().alias(series.name)
+    invalid = date_str.is_not_null() & dates.is_null()
+
+    if errors == "raise" and invalid.any():
+        raise ValueError(f"Invalid date format: {series.filter(invalid).to_list()}")
+    if as_series:
+        return dates, invalid
+    return dates.to_numpy(), invalid.to_numpy()
+
 
 def localize_naive_datetimes(
         naive_list: list[datetime | None],
@@ -117,60 +251,351 @@ def convert_local_datetimes_to_utc(
     return [dt.astimezone(timezone.utc) if dt is not None else None for dt in aware_list]
 
 
-def make_naive_df_timezone_aware(
-        df: pl.DataFrame,
-        col: str = "datetime_naive",
+@lru_cache(maxsize=None)
+def _zone_transition_table(tz: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Build the UTC offset transition table of a timezone, once per zone.
+
+    The zone is probed daily between TRANSITION_TABLE_START and TRANSITION_TABLE_END and every offset change is
+    bisected down to the second, so transitions closer than a day to each other are not picked up.
+
+    Returns:
+        tuple: A tuple containing:
+            - np.ndarray: Sorted UTC epoch seconds at which a new offset takes effect.
+            - np.ndarray: UTC offsets in seconds, one longer than the transitions; offsets[i] applies before
+                          transitions[i] and offsets[-1] after the last transition.
+    """
+    zone = ZoneInfo(tz)
+
+    def offset_at(epoch_seconds: int) -> int:
+        return int(datetime.fromtimestamp(epoch_seconds, zone).utcoffset().total_seconds())
+
+    start = int(TRANSITION_TABLE_START.timestamp())
+    end = int(TRANSITION_TABLE_END.timestamp())
+    transitions = []
+    offsets = [offset_at(start)]
+    previous = start
+    for probe in range(start + _SECONDS_PER_DAY, end + 1, _SECONDS_PER_DAY):
+        if offset_at(probe) == offsets[-1]:
+            previous = probe
+            continue
+        # bisect for the first second at which the new offset applies
+        low, high = previous, probe
+        while high - low > 1:
+            middle = (low + high) // 2
+            if offset_at(middle) == offsets[-1]:
+                low = middle
+            else:
+                high = middle
+        transitions.append(high)
+        offsets.append(offset_at(high))
+        previous = probe
+
+    return np.array(transitions, dtype=np.int64), np.array(offsets, dtype=np.int64)
+
+
+def _to_epochs(values: np.ndarray, unit: str, mask: np.ndarray | None) -> tuple[np.ndarray, str, np.ndarray]:
+    """Normalize a datetime64 or int64 epoch array to (int64 epochs, epoch unit, missing mask)."""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        unit = np.datetime_data(values.dtype)[0]
+        if unit not in _EPOCH_UNITS_PER_SECOND:
+            unit = "s"
+            values = values.astype("datetime64[s]")
+        missing = np.isnat(values)
+        epochs = values.view(np.int64)
+    elif np.issubdtype(values.dtype, np.integer):
+        if unit not in _EPOCH_UNITS_PER_SECOND:
+            raise ValueError(f"unit must be one of {list(_EPOCH_UNITS_PER_SECOND)}. Found: {unit}")
+        epochs = values.astype(np.int64, copy=False)
+        missing = epochs == _NAT
+    else:
+        raise TypeError(f"Expected a datetime64 or integer epoch array. Found: {values.dtype}")
+    if mask is not None:
+        missing = missing | np.asarray(mask, dtype=bool)
+    return epochs, unit, missing
+
+
+def _from_epochs(epochs: np.ndarray, unit: str, missing: np.ndarray, as_datetime64: bool) -> np.ndarray:
+    """Inverse of `_to_epochs`: put NaT on the missing positions and restore the datetime64 dtype if needed."""
+    epochs[missing] = _NAT
+    if as_datetime64:
+        return epochs.view(f"datetime64[{unit}]")
+    return epochs
+
+
+def _utc_offsets(epochs: np.ndarray, tz: str, unit: str) -> np.ndarray:
+    """Look up the UTC offset, in `unit`, in effect at every UTC epoch."""
+    transitions, offsets = _zone_transition_table(tz)
+    units_per_second = _EPOCH_UNITS_PER_SECOND[unit]
+    return offsets[np.searchsorted(transitions * units_per_second, epochs, side="right")] * units_per_second
+
+
+def localize_naive_datetime64(
+        naive: np.ndarray,
         tz: str = "Europe/Brussels",
-        col_utc: str = "datetime_utc",
-        col_local: str = "datetime_local"
-) -> pl.DataFrame:
+        mask: np.ndarray | None = None,
+        unit: str = "us"
+) -> np.ndarray:
     """
-    Convert a column of naive Python datetime.datetime objects (no tzinfo) into timezone-aware datetimes in the given timezone,
-    resolving ambiguous (DST fallback) times automatically so the resulting timeline is non-decreasing.
+    Array counterpart of `localize_naive_datetimes` followed by `convert_local_datetimes_to_utc`.
 
-    Note: ambiguous="infer" exists in pandas, but does not in python stdlib or polars. Hence this convoluted implementation.
+    Localizes naive wall times into the given timezone, resolving ambiguous (DST fallback) times so the resulting
+    timeline is non-decreasing, and returns the corresponding UTC epochs. Offsets are looked up in a cached
+    per-zone transition table instead of going through Python datetime objects.
 
     Args:
-        df (pl.DataFrame): Input DataFrame containing the naive datetime column (Python datetime.datetime objects).
-        col (str): Name of the column with naive datetimes. Default is "datetime_naive".
+        naive (np.ndarray): Naive wall times as a datetime64 array, or as an int64 epoch array in `unit`.
         tz (str): Timezone to localize the datetimes to. Default is "Europe/Brussels".
-        col_utc (str): Name for the new UTC datetime column. Default is "datetime_utc".
-        col_local (str): Name for the new local timezone-aware datetime column. Default is "datetime_local".
+        mask (np.ndarray | None): Optional boolean array, True marking missing elements. NaT is always missing.
+        unit (str): Epoch unit of an integer input ("s", "ms", "us" or "ns"). Ignored for datetime64 input.
 
     Returns:
-        pl.DataFrame: A new DataFrame with two additional columns:
-            - `col_utc`: UTC datetimes (`Datetime[ns, tz="UTC"]`)
-            - `col_local`: Local timezone-aware datetimes (`Datetime[ns, tz]`)
-        The original column is left untouched.
+        np.ndarray: UTC epochs with the same dtype as the input (datetime64 or int64), NaT on missing elements.
     """
+    as_datetime64 = np.issubdtype(np.asarray(naive).dtype, np.datetime64)
+    epochs, unit, missing = _to_epochs(naive, unit, mask)
+    if epochs.size == 0:
+        return _from_epochs(epochs.copy(), unit, missing, as_datetime64)
+
+    # fold=1 whenever time does not move forward compared to the previous non-missing element
+    positions = np.where(missing, -1, np.arange(epochs.size))
+    previous_positions = np.maximum.accumulate(positions)
+    previous_positions = np.concatenate(([-1], previous_positions[:-1]))
+    fold = (previous_positions >= 0) & (epochs <= epochs[np.maximum(previous_positions, 0)])
+
+    # candidate offsets before and after a possible nearby transition, and whether they are consistent
+    one_day = _SECONDS_PER_DAY * _EPOCH_UNITS_PER_SECOND[unit]
+    safe = np.where(missing, 0, epochs)
+    offset_before = _utc_offsets(safe - one_day, tz, unit)
+    offset_after = _utc_offsets(safe + one_day, tz, unit)
+    utc_before = safe - offset_before
+    utc_after = safe - offset_after
+    valid_before = _utc_offsets(utc_before, tz, unit) == offset_before
+    valid_after = _utc_offsets(utc_after, tz, unit) == offset_after
+    use_after = np.where(valid_before != valid_after, valid_after, fold)
+
+    return _from_epochs(np.where(use_after, utc_after, utc_before), unit, missing, as_datetime64)
+
+
+def convert_utc_datetime64_to_local(
+        utc: np.ndarray,
+        tz: str = "Europe/Brussels",
+        mask: np.ndarray | None = None,
+        unit: str = "us"
+) -> np.ndarray:
+    """
+    Convert UTC epochs into naive local wall times of the given timezone, the inverse of `localize_naive_datetime64`.
+
+    Args:
+        utc (np.ndarray): UTC instants as a datetime64 array, or as an int64 epoch array in `unit`.
+        tz (str): Timezone of the resulting wall times. Default is "Europe/Brussels".
+        mask (np.ndarray | None): Optional boolean array, True marking missing elements. NaT is always missing.
+        unit (str): Epoch unit of an integer input ("s", "ms", "us" or "ns"). Ignored for datetime64 input.
+
+    Returns:
+        np.ndarray: Naive local wall times with the same dtype as the input (datetime64 or int64), NaT on missing elements.
+    """
+    as_datetime64 = np.issubdtype(np.asarray(utc).dtype, np.datetime64)
+    epochs, unit, missing = _to_epochs(utc, unit, mask)
+    safe = np.where(missing, 0, epochs)
+    return _from_epochs(safe + _utc_offsets(safe, tz, unit), unit, missing, as_datetime64)
+
+
+def _previous_non_null_expr(col: str, by: str | list[str] | None = None) -> pl.Expr:
+    """Expression yielding, for every row, the last non-null value of `col` that precedes it (within its `by` group)."""
+    previous = pl.col(col).forward_fill().shift(1)
+    if by is not None:
+        previous = previous.over(by)
+    return previous
 
-    # check if the col in this df is already of python datetime type, if not abort
-    if col not in df.columns:
+
+def _fold_expr(col: str, previous: pl.Expr) -> pl.Expr:
+    """
+    Expression yielding the PEP 495 fold flag for every row of `col`, given the previous non-null naive value.
+
+    Mirrors `localize_naive_datetimes`: time moving backwards (or standing still) selects fold=1, anything else fold=0.
+    """
+    return (pl.col(col) <= previous).fill_null(False)
+
+
+def _utc_offset_expr(instant: pl.Expr, tz: str, time_unit: str) -> pl.Expr:
+    """Expression yielding the total UTC offset of `tz` at the naive UTC instant `instant`, in `time_unit`."""
+    local = instant.dt.replace_time_zone("UTC").dt.convert_time_zone(tz)
+    return (local.dt.base_utc_offset() + local.dt.dst_offset()).cast(pl.Duration(time_unit))
+
+
+def _localize_naive(
+        frame: pl.DataFrame | pl.LazyFrame,
+        col: str,
+        tz: str,
+        col_utc: str,
+        col_local: str,
+        time_unit: str,
+        fold: pl.Expr
+) -> pl.DataFrame | pl.LazyFrame:
+    """
+    Add `col_utc` and `col_local` to `frame` for the naive column `col`, given an expression for the fold flag.
+
+    A wall time t has two candidate UTC instants: t minus the offset in effect a day earlier (the offset before any
+    nearby transition, fold=0) and t minus the offset in effect a day later (the offset after it, fold=1).
+    A candidate is valid when its own offset is the one it was derived with. Ambiguous times have two valid candidates
+    and non-existent times have none; in both cases the fold flag picks one, exactly like `datetime.replace(fold=...)`.
+    The offsets are computed in stages on temporary columns, so every zone lookup runs exactly once per row.
+    """
+    naive = pl.col(col)
+    one_day = pl.duration(days=1)
+    tmp_fold, tmp_before, tmp_after, tmp_valid_before, tmp_valid_after = (
+        f"__{col}_{name}" for name in ("fold", "offset_before", "offset_after", "valid_before", "valid_after")
+    )
+    utc_before = naive - pl.col(tmp_before)
+    utc_after = naive - pl.col(tmp_after)
+    utc = (
+        pl.when(pl.col(tmp_valid_before) & ~pl.col(tmp_valid_after)).then(utc_before)
+        .when(pl.col(tmp_valid_after) & ~pl.col(tmp_valid_before)).then(utc_after)
+        .when(pl.col(tmp_fold)).then(utc_after)
+        .otherwise(utc_before)
+    ).dt.replace_time_zone("UTC")
+
+    return (
+        frame
+        .with_columns(
+            fold.alias(tmp_fold),
+            _utc_offset_expr(naive - one_day, tz, time_unit).alias(tmp_before),
+            _utc_offset_expr(naive + one_day, tz, time_unit).alias(tmp_after),
+        )
+        .with_columns(
+            (_utc_offset_expr(utc_before, tz, time_unit) == pl.col(tmp_before)).alias(tmp_valid_before),
+            (_utc_offset_expr(utc_after, tz, time_unit) == pl.col(tmp_after)).alias(tmp_valid_after),
+        )
+        .with_columns(utc.alias(col_utc), utc.dt.convert_time_zone(tz).alias(col_local))
+        .drop(tmp_fold, tmp_before, tmp_after, tmp_valid_before, tmp_valid_after)
+    )
+
+
+def _check_localize_schema(
+        schema: pl.Schema,
+        col: str,
+        col_utc: str,
+        col_local: str,
+        by: str | list[str] | None = None
+) -> None:
+    """Validate that `col` is a naive datetime column, that the `by` columns exist and that the outputs do not."""
+    if col not in schema:
         raise ValueError(f"Column '{col}' not found in DataFrame.")
-    col_dtype = df.schema[col]
-    if col_dtype not in [pl.Datetime]:
-        raise ValueError(f"Column '{col}' must be of type pl.Datetime[ns]. Found: {col_dtype}")
+    for key in [by] if isinstance(by, str) else by or []:
+        if key not in schema:
+            raise ValueError(f"Group column '{key}' not found in DataFrame.")
+    col_dtype = schema[col]
+    if not isinstance(col_dtype, pl.Datetime):
+        raise ValueError(f"Column '{col}' must be of type pl.Datetime. Found: {col_dtype}")
+    if col_dtype.time_zone is not None:
+        raise ValueError(f"Column '{col}' must hold naive datetimes, got timezone-aware: {col_dtype}")
     # check if the name provided in col_utc and col_local already exist in df
-    if col_utc in df.columns:
+    if col_utc in schema:
         raise ValueError(f"Column '{col_utc}' already exists in DataFrame.")
-    if col_local in df.columns:
+    if col_local in schema:
         raise ValueError(f"Column '{col_local}' already exists in DataFrame.")
 
-    # get naive datetime list from dataframe
-    naive_list = df[col].to_list()
 
-    # convert to timezone-aware datetimes in the specified timezone
-    aware_list = localize_naive_datetimes(naive_list, tz)
+def make_naive_df_timezone_aware(
+        df: pl.DataFrame | pl.LazyFrame,
+        col: str = "datetime_naive",
+        tz: str = "Europe/Brussels",
+        col_utc: str = "datetime_utc",
+        col_local: str = "datetime_local",
+        by: str | list[str] | None = None
+) -> pl.DataFrame | pl.LazyFrame:
+    """
+    Convert a column of naive datetimes (no tzinfo) into timezone-aware datetimes in the given timezone,
+    resolving ambiguous (DST fallback) times automatically so the resulting timeline is non-decreasing.
 
-    # convert to UTC
-    aware_list_utc = convert_local_datetimes_to_utc(aware_list)
+    Note: ambiguous="infer" exists in pandas, but does not in python stdlib or polars. Hence this implementation
+    derives the fold flag itself with polars expressions (a backward step of the naive timeline means fold=1),
+    giving the same result as `localize_naive_datetimes` without materializing Python datetime objects.
 
-    # build Polars series
-    s_local = pl.Series(name=col_local, values=aware_list, )
+    Args:
+        df (pl.DataFrame | pl.LazyFrame): Input frame containing the naive datetime column.
+            A LazyFrame yields a LazyFrame; see `iter_naive_lf_timezone_aware` to process it in bounded memory.
+        col (str): Name of the column with naive datetimes. Default is "datetime_naive".
+        tz (str): Timezone to localize the datetimes to. Default is "Europe/Brussels".
+        col_utc (str): Name for the new UTC datetime column. Default is "datetime_utc".
+        col_local (str): Name for the new local timezone-aware datetime column. Default is "datetime_local".
+        by (str | list[str] | None): Column(s) identifying independent series stacked in long format. The fold
+            state is tracked per group, as a polars window expression that is evaluated on all cores.
+            Rows keep their original order. Default is None, treating the whole column as one series.
+
+    Returns:
+        pl.DataFrame | pl.LazyFrame: A new frame with two additional columns:
+            - `col_utc`: UTC datetimes (`Datetime[tu, tz="UTC"]`)
+            - `col_local`: Local timezone-aware datetimes (`Datetime[tu, tz]`)
+        The time unit `tu` of the original column is kept. The original column is left untouched.
+    """
+    schema = df.collect_schema()
+    _check_localize_schema(schema, col, col_utc, col_local, by)
+    fold = _fold_expr(col, _previous_non_null_expr(col, by))
+    return _localize_naive(df, col, tz, col_utc, col_local, schema[col].time_unit, fold)
+
+
+def iter_naive_lf_timezone_aware(
+        lf: pl.LazyFrame,
+        col: str = "datetime_naive",
+        tz: str = "Europe/Brussels",
+        col_utc: str = "datetime_utc",
+        col_local: str = "datetime_local",
+        by: str | list[str] | None = None,
+        chunk_size: int | None = None
+) -> Iterator[pl.DataFrame]:
+    """
+    Streaming variant of `make_naive_df_timezone_aware` for LazyFrames that do not fit in memory.
 
-    s_utc = pl.Series(name=col_utc, values=aware_list_utc, )
+    The query is executed with the streaming engine and localized batch by batch. The last non-null naive datetime
+    of every batch (per `by` group) is carried over to the next one, so the fold decision at batch boundaries and
+    therefore the concatenated result are identical to the eager path.
 
-    # add both UTC and local datetimes to dataframe
-    df_aware = df.with_columns([s_utc, s_local])
+    Args:
+        lf (pl.LazyFrame): Input LazyFrame containing the naive datetime column, e.g. from `pl.scan_parquet`.
+        col (str): Name of the column with naive datetimes. Default is "datetime_naive".
+        tz (str): Timezone to localize the datetimes to. Default is "Europe/Brussels".
+        col_utc (str): Name for the new UTC datetime column. Default is "datetime_utc".
+        col_local (str): Name for the new local timezone-aware datetime column. Default is "datetime_local".
+        by (str | list[str] | None): Column(s) identifying independent series, see `make_naive_df_timezone_aware`.
+        chunk_size (int | None): Number of rows per batch. Default lets polars decide.
 
-    return df_aware
+    Yields:
+        pl.DataFrame: Consecutive localized batches, in the original row order.
+    """
+    schema = lf.collect_schema()
+    _check_localize_schema(schema, col, col_utc, col_local, by)
+    col_dtype = schema[col]
+    batches = lf.collect_batches(chunk_size=chunk_size, maintain_order=True)
+
+    if by is None:
+        # physical (int64) value of the last non-null naive datetime seen so far
+        previous = None
+        for batch in batches:
+            carried = pl.lit(previous, dtype=pl.Int64).cast(col_dtype)
+            fold = _fold_expr(col, _previous_non_null_expr(col).fill_null(carried))
+            yield _localize_naive(batch, col, tz, col_utc, col_local, col_dtype.time_unit, fold)
+
+            non_null = batch.get_column(col).drop_nulls()
+            if len(non_null):
+                previous = non_null.to_physical()[-1]
+        return
+
+    # last non-null naive datetime seen so far, per group
+    by = [by] if isinstance(by, str) else list(by)
+    tmp_carried = f"__{col}_carried"
+    carried = pl.DataFrame(schema={**{key: schema[key] for key in by}, tmp_carried: col_dtype})
+    for batch in batches:
+        batch = batch.join(carried, on=by, how="left", nulls_equal=True, maintain_order="left")
+        fold = _fold_expr(col, _previous_non_null_expr(col, by).fill_null(pl.col(tmp_carried)))
+        yield _localize_naive(batch, col, tz, col_utc, col_local, col_dtype.time_unit, fold).drop(tmp_carried)
+
+        last = (
+            batch
+            .filter(pl.col(col).is_not_null())
+            .group_by(by, maintain_order=True)
+            .agg(pl.col(col).last().alias(tmp_carried))
+        )
+        carried = pl.concat([carried, last]).unique(subset=by, keep="last", maintain_order=True)
@@ -1,17 +1,105 @@
-__all__ = ["merge_dicts", "has_empty_leaves"]
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from functools import wraps
+
+__all__ = [
+    "merge_dicts",
+    "merged_dicts",
+    "diff_dicts",
+    "apply_dict_patch",
+    "has_empty_leaves",
+    "LeafIndex",
+    "LayeredDict",
+    "dict_fingerprint",
+    "memoize_dicts",
+]
 
 def merge_dicts(insert_into: dict, insert_from: dict) -> dict: 
     """Recursively merge dict2 into dict1. Values in dict2 overwrite those in dict1."""
-    for key, value in insert_from.items():
-        if isinstance(value, dict) and key in insert_into and isinstance(insert_into[key], dict):
-            # If both values are dictionaries, merge them recursively
-            merge_dicts(insert_into[key], value)
-        else:
-            # Otherwise, overwrite the value in dict1 with the value from dict2
-            insert_into[key] = value
+    # explicit stack instead of recursion, so very deep trees do not hit the recursion limit
+    stack = [(insert_into, insert_from)]
+    while stack:
+        target, source = stack.pop()
+        for key, value in source.items():
+            if isinstance(value, dict) and key in target and isinstance(target[key], dict):
+                # If both values are dictionaries, merge them recursively
+                stack.append((target[key], value))
+            else:
+                # Otherwise, overwrite the value in dict1 with the value from dict2
+                target[key] = value
     return insert_into
 
 
+def merged_dicts(insert_into: dict, insert_from: dict) -> dict:
+    """
+    Non-mutating variant of merge_dicts: returns the merge of dict2 into dict1 and leaves both untouched.
+    Only the dicts on the path to an overwritten value are copied, all other branches are shared by reference
+    with the inputs, so treat the result as read-only or copy it before mutating nested values.
+    """
+    merged = dict(insert_into)
+    stack = [(merged, insert_from)]
+    while stack:
+        target, source = stack.pop()
+        for key, value in source.items():
+            if isinstance(value, dict) and key in target and isinstance(target[key], dict):
+                if value:
+                    # copy the branch we are about to change, keep sharing the ones we do not touch
+                    target[key] = dict(target[key])
+                    stack.append((target[key], value))
+            else:
+                target[key] = value
+    return merged
+
+
+def diff_dicts(old: dict, new: dict) -> dict:
+    """
+    Compute the structural difference between two nested dicts, as a patch for apply_dict_patch:
+    {"added": {path: value}, "removed": [path], "changed": {path: value}} with paths as tuples of keys.
+    Identical subtrees are skipped by identity without being walked, equal ones are walked down to their leaves.
+    A key whose value turns from a dict into a leaf or back is changed as a whole.
+    """
+    added = {}
+    removed = []
+    changed = {}
+    stack = [((), old, new)]
+    while stack:
+        path, old_dict, new_dict = stack.pop()
+        for key in old_dict:
+            if key not in new_dict:
+                removed.append(path + (key,))
+        for key, value in new_dict.items():
+            if key not in old_dict:
+                added[path + (key,)] = value
+                continue
+            old_value = old_dict[key]
+            if old_value is value:
+                continue
+            if isinstance(old_value, dict) and isinstance(value, dict):
+                # no equality check here: it would recurse and compare the subtree again at every level
+                stack.append((path + (key,), old_value, value))
+            elif isinstance(old_value, dict) or isinstance(value, dict) or old_value != value:
+                changed[path + (key,)] = value
+    return {"added": added, "removed": removed, "changed": changed}
+
+
+def apply_dict_patch(d: dict, patch: dict) -> dict:
+    """Apply a patch from diff_dicts to the dict it was computed from, in place. The patch values are not copied."""
+    for path in patch["removed"]:
+        parent = d
+        for key in path[:-1]:
+            parent = parent[key]
+        del parent[path[-1]]
+    for values in (patch["changed"], patch["added"]):
+        for path, value in values.items():
+            parent = d
+            for key in path[:-1]:
+                parent = parent[key]
+            parent[path[-1]] = value
+    return d
+
+
 def has_empty_leaves(d: dict) -> bool:
     """Recursively checks if any leaf value in a nested dictionary is None or an empty string."""
     for key, value in d.items():
@@ -21,4 +109,363 @@ def has_empty_leaves(d: dict) -> bool:
                 return True
         elif value is None or value == "":
             return True
-    return False
\ No newline at end of file
+    return False
+
+
+def _is_empty_leaf(value) -> bool:
+    return value is None or (isinstance(value, str) and value == "")
+
+
+class LeafIndex(Mapping):
+    """
+    Flat index of the leaves of a nested dict, by dotted path: LeafIndex({"db": {"port": 1}})["db.port"] == 1.
+    Built once without recursion, then kept up to date by set, delete and update, which write through to the dict.
+    The paths of empty leaves (None or "", as in has_empty_leaves) are tracked on every change, so repeated validation
+    is a set lookup that also tells which keys are empty. Keys are expected to be strings that do not contain `sep`.
+    """
+
+    def __init__(self, d: dict, sep: str = "."):
+        self.data = d
+        self.sep = sep
+        self._leaves = {}
+        self._empty = set()
+        self._add_subtree("", d)
+
+    def _join(self, prefix: str, key: str) -> str:
+        return f"{prefix}{self.sep}{key}" if prefix else key
+
+    def _subtree_leaves(self, prefix: str, d: dict):
+        """Yield the (path, value) pairs of the leaves below a dict."""
+        stack = [(prefix, d)]
+        while stack:
+            current_prefix, current = stack.pop()
+            for key, value in current.items():
+                path = self._join(current_prefix, key)
+                if isinstance(value, dict):
+                    stack.append((path, value))
+                else:
+                    yield path, value
+
+    def _add_subtree(self, path: str, value) -> None:
+        leaves = self._subtree_leaves(path, value) if isinstance(value, dict) else [(path, value)]
+        for leaf_path, leaf in leaves:
+            self._leaves[leaf_path] = leaf
+            if _is_empty_leaf(leaf):
+                self._empty.add(leaf_path)
+
+    def _remove_subtree(self, path: str, value) -> None:
+        leaves = self._subtree_leaves(path, value) if isinstance(value, dict) else [(path, value)]
+        for leaf_path, _ in leaves:
+            del self._leaves[leaf_path]
+            self._empty.discard(leaf_path)
+
+    def _parent(self, path: str, create: bool) -> tuple[dict, str]:
+        """Return the dict holding a path and the last key of the path."""
+        *keys, last = path.split(self.sep)
+        parent = self.data
+        for depth, key in enumerate(keys):
+            child = parent.get(key)
+            if not isinstance(child, dict):
+                if not create:
+                    raise KeyError(path)
+                # like merge_dicts, a dict overwrites a leaf in its way
+                if key in parent:
+                    self._remove_subtree(self.sep.join(keys[:depth + 1]), child)
+                child = parent[key] = {}
+            parent = child
+        return parent, last
+
+    def __getitem__(self, path: str):
+        return self._leaves[path]
+
+    def __iter__(self):
+        return iter(self._leaves)
+
+    def __len__(self) -> int:
+        return len(self._leaves)
+
+    def set(self, path: str, value) -> None:
+        """Set the value at a dotted path, creating the dicts on the way. A dict value is indexed leaf by leaf."""
+        parent, key = self._parent(path, create=True)
+        if key in parent:
+            self._remove_subtree(path, parent[key])
+        parent[key] = value
+        self._add_subtree(path, value)
+
+    def delete(self, path: str) -> None:
+        """Remove the leaf or subtree at a dotted path."""
+        parent, key = self._parent(path, create=False)
+        self._remove_subtree(path, parent.pop(key))
+
+    def update(self, insert_from: dict) -> None:
+        """Merge a nested dict into the indexed dict like merge_dicts, only re-indexing the overwritten keys."""
+        stack = [("", self.data, insert_from)]
+        while stack:
+            prefix, target, source = stack.pop()
+            for key, value in source.items():
+                path = self._join(prefix, key)
+                if isinstance(value, dict) and key in target and isinstance(target[key], dict):
+                    stack.append((path, target[key], value))
+                else:
+                    if key in target:
+                        self._remove_subtree(path, target[key])
+                    target[key] = value
+                    self._add_subtree(path, value)
+
+    @property
+    def empty_paths(self) -> list[str]:
+        """Sorted paths of the leaves that are None or an empty string."""
+        return sorted(self._empty)
+
+    def has_empty_leaves(self) -> bool:
+        return bool(self._empty)
+
+    def validate(self) -> None:
+        """Raise a ValueError naming the empty leaves, if there are any."""
+        if self._empty:
+            raise ValueError(f"Empty values at: {', '.join(self.empty_paths)}")
+
+
+_MISSING = object()
+
+
+class _LayerState:
+    """Layers and resolution cache shared by a LayeredDict and all its nested views."""
+
+    def __init__(self, layers: list[dict]):
+        self.layers = layers
+        # path -> resolved leaf value, or _Node for a nested dict
+        self.cache = {}
+        # path -> keys below it that have a cache entry
+        self.cached_children = {}
+
+    def resolve(self, path: tuple):
+        """Resolve a path across the layers, memoizing every prefix on the way. Raises KeyError if absent."""
+        resolved = self.cache.get(path, _MISSING)
+        if resolved is not _MISSING:
+            return resolved
+        # walk down from the deepest cached prefix
+        depth = len(path)
+        while depth > 0 and path[:depth] not in self.cache:
+            depth -= 1
+        if depth == 0 and () not in self.cache:
+            self.cache[()] = _Node(list(reversed(self.layers)))
+        resolved = self.cache[path[:depth]]
+        for depth in range(depth, len(path)):
+            if not isinstance(resolved, _Node):
+                raise KeyError(path[depth])
+            key = path[depth]
+            values = [contribution[key] for contribution in resolved.contributions if key in contribution]
+            if not values:
+                raise KeyError(key)
+            if isinstance(values[0], dict):
+                # a higher layer dict is merged into lower layer dicts, but overwrites lower layer non-dict values
+                contributions = []
+                for value in values:
+                    if not isinstance(value, dict):
+                        break
+                    contributions.append(value)
+                resolved = _Node(contributions)
+            else:
+                resolved = values[0]
+            self.cache[path[:depth + 1]] = resolved
+            self.cached_children.setdefault(path[:depth], set()).add(key)
+        return resolved
+
+    def invalidate(self, path: tuple) -> None:
+        """Drop the cache entries of a path and everything below it."""
+        if path:
+            self.cached_children.get(path[:-1], set()).discard(path[-1])
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            self.cache.pop(current, None)
+            stack.extend(current + (key,) for key in self.cached_children.pop(current, ()))
+
+
+class _Node:
+    """A resolved nested dict: the dicts of all layers that contribute to it, highest priority first."""
+    __slots__ = ("contributions",)
+
+    def __init__(self, contributions: list[dict]):
+        self.contributions = contributions
+
+
+class LayeredDict(Mapping):
+    """
+    Read-only deep-merge view over a stack of nested dict layers, lowest priority first, like a ChainMap that merges
+    nested dicts the way merge_dicts does: LayeredDict(defaults, site, cli) reads like
+    merge_dicts(merge_dicts(deepcopy(defaults), site), cli) but nothing is merged up front.
+    Keys are resolved lazily when looked up and every resolved path is memoized. Nested dicts are returned as views.
+    Change layers through update_layer, which only invalidates the paths it touches, or set_layer.
+    Mutating the layer dicts directly bypasses the invalidation.
+    """
+
+    def __init__(self, *layers: dict):
+        self._state = _LayerState(list(layers))
+        self._path = ()
+
+    @classmethod
+    def _view(cls, state: _LayerState, path: tuple) -> "LayeredDict":
+        view = cls.__new__(cls)
+        view._state = state
+        view._path = path
+        return view
+
+    def _node(self) -> _Node:
+        return self._state.resolve(self._path)
+
+    def __getitem__(self, key):
+        path = self._path + (key,)
+        resolved = self._state.resolve(path)
+        if isinstance(resolved, _Node):
+            return self._view(self._state, path)
+        return resolved
+
+    def __iter__(self):
+        # keys in the order a merge of the layers would produce them
+        keys = {}
+        for contribution in reversed(self._node().contributions):
+            keys.update(dict.fromkeys(contribution))
+        return iter(keys)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> dict:
+        """Materialize the merged view into a plain dict, sharing untouched branches with the layers."""
+        merged = {}
+        for contribution in reversed(self._node().contributions):
+            merged = merged_dicts(merged, contribution)
+        return merged
+
+    @property
+    def layers(self) -> list[dict]:
+        return self._state.layers
+
+    def update_layer(self, index: int, insert_from: dict) -> None:
+        """Merge `insert_from` into the layer at `index` like merge_dicts, only invalidating the paths it overwrites."""
+        state = self._state
+        stack = [(state.layers[index], insert_from, ())]
+        while stack:
+            target, source, path = stack.pop()
+            for key, value in source.items():
+                if isinstance(value, dict) and key in target and isinstance(target[key], dict):
+                    # merged in place, the same dict keeps contributing, so only the keys below may change
+                    stack.append((target[key], value, path + (key,)))
+                else:
+                    target[key] = value
+                    state.invalidate(path + (key,))
+
+    def set_layer(self, index: int, layer: dict) -> None:
+        """Replace the layer at `index`, dropping the whole resolution cache."""
+        self._state.layers[index] = layer
+        self._state.invalidate(())
+
+
+def dict_fingerprint(obj) -> frozenset:
+    """
+    Hashable fingerprint of a nested structure of dicts, lists, tuples and sets. Equal structures give equal
+    fingerprints, independent of dict key order, and dicts, lists and sets never collide with each other.
+    The fingerprint is a flat set of (path, kind, value) entries, one per container and leaf, built without recursion,
+    so hashing and comparing it does not recurse either, however deep the structure. As every entry holds its full
+    path, its size grows with the depth of the entries, which only matters for pathologically deep structures.
+    Raises a TypeError for unhashable values of any other type.
+    """
+    entries = []
+    stack = [((), obj)]
+    while stack:
+        path, value = stack.pop()
+        if isinstance(value, dict):
+            entries.append((path, dict, None))
+            stack.extend((path + (key,), child) for key, child in value.items())
+        elif isinstance(value, (list, tuple)):
+            entries.append((path, type(value), len(value)))
+            stack.extend((path + (index,), child) for index, child in enumerate(value))
+        elif isinstance(value, (set, frozenset)):
+            entries.append((path, set, frozenset(value)))
+        else:
+            entries.append((path, object, value))
+    return frozenset(entries)
+
+
+def memoize_dicts(maxsize: int | None = 128, ttl: float | None = None, assume_immutable: bool = False) -> Callable:
+    """
+    Like functools.lru_cache, but for functions taking nested dicts or lists, keyed on their dict_fingerprint.
+    Keeps at most `maxsize` results (None for no limit), evicting the least recently used, and expires results
+    `ttl` seconds after they were computed. Cached results are shared between calls, so do not mutate them.
+    With assume_immutable, the fingerprint of a dict or list argument is also cached by identity, skipping the walk
+    when the same object is passed again; only use it when arguments are never mutated after their first call.
+    The decorated function gets cache_info(), returning hits, misses, evictions, expirations and sizes, and
+    cache_clear().
+    """
+
+    def decorator(func: Callable) -> Callable:
+        cache = OrderedDict()
+        # id -> (object, fingerprint), the reference keeps the id from being reused
+        fingerprints = OrderedDict()
+        fingerprints_size = maxsize if maxsize is not None else 1024
+        stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        lock = threading.Lock()
+
+        def fingerprint(obj):
+            if not assume_immutable or not isinstance(obj, (dict, list)):
+                return dict_fingerprint(obj)
+            with lock:
+                known = fingerprints.get(id(obj))
+                if known is not None and known[0] is obj:
+                    fingerprints.move_to_end(id(obj))
+                    return known[1]
+            computed = dict_fingerprint(obj)
+            with lock:
+                fingerprints[id(obj)] = (obj, computed)
+                if len(fingerprints) > fingerprints_size:
+                    fingerprints.popitem(last=False)
+            return computed
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (
+                tuple(fingerprint(arg) for arg in args),
+                frozenset((name, fingerprint(value)) for name, value in kwargs.items()),
+            )
+            now = time.monotonic() if ttl is not None else None
+            with lock:
+                entry = cache.get(key)
+                if entry is not None:
+                    if now is None or entry[1] > now:
+                        cache.move_to_end(key)
+                        stats["hits"] += 1
+                        return entry[0]
+                    del cache[key]
+                    stats["expirations"] += 1
+                stats["misses"] += 1
+
+            result = func(*args, **kwargs)
+            with lock:
+                cache[key] = (result, now + ttl if now is not None else None)
+                cache.move_to_end(key)
+                if maxsize is not None and len(cache) > maxsize:
+                    cache.popitem(last=False)
+                    stats["evictions"] += 1
+            return result
+
+        def cache_info() -> dict:
+            with lock:
+                return {**stats, "maxsize": maxsize, "currsize": len(cache)}
+
+        def cache_clear() -> None:
+            with lock:
+                cache.clear()
+                fingerprints.clear()
+                for name in stats:
+                    stats[name] = 0
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
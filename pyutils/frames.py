@@ -0,0 +1,29 @@
+"""
+Cheap caller introspection.
+
+Usage:
+- caller_file_name() returns the file name of the function calling the function that calls it
+"""
+
+import os
+import sys
+from functools import lru_cache
+from types import CodeType
+
+__all__ = [
+    "caller_file_name",
+]
+
+
+@lru_cache(maxsize=1024)
+def _code_file_name(code: CodeType) -> str:
+    return os.path.basename(code.co_filename)
+
+
+def caller_file_name(depth: int = 1) -> str:
+    """
+    Returns the file name (without folders) of the frame `depth` levels above the function calling this.
+    Unlike inspect.stack(), only that one frame is looked at and no source lines are read, and the name is cached per
+    code object.
+    """
+    return _code_file_name(sys._getframe(depth + 1).f_code)
@@ -5,28 +5,54 @@ Usage:
 - setup_root_logger() only logs to console
 - setup_root_logger(with_logfile=True) also logs to a new timestamped log file each time
 - setup_root_logger(with_logfile=True, timestamp_log_file=False) also logs to console and the same log file each time
+- setup_root_logger(use_queue=True) hands records to a background thread that does the formatting and I/O
+- setup_root_logger(with_logfile=True, file_format="jsonl", rotate_bytes=...) writes buffered, rotated JSON lines
+- setup_root_logger(rate_limit=10) lets through at most about 10 records per second from each logging call site
+- setup_root_logger(multiprocess=True) also handles the records of worker processes set up with setup_worker_logger:
+  ProcessPoolExecutor(initializer=setup_worker_logger, initargs=worker_logger_initargs())
 """
 
-import inspect
+import atexit
+import gzip
+import json
 import logging
+import multiprocessing
 import os
+import queue
+import shutil
 import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 
 from pyutils.clock import get_current_date_and_time_str
+from pyutils.frames import caller_file_name
 
 __all__ = [
     "get_logger",
     "setup_root_logger",
+    "setup_worker_logger",
+    "worker_logger_initargs",
+    "JsonLinesFormatter",
+    "JsonLinesFileHandler",
+    "RateLimitFilter",
     ]
 
+QUEUE_POLICIES = ("block", "drop_new", "drop_oldest")
+FILE_FORMATS = ("text", "jsonl")
+# listener of the current queue based setup, stopped on a new setup and at interpreter shutdown
+_queue_listener: "_QueueListener | None" = None
+# listener passing the records of worker processes to the handlers of this process
+_worker_listener: QueueListener | None = None
+# rate limit filter of the current setup and the handlers it is on, to report its pending counts before they close
+_rate_limit: "tuple[RateLimitFilter, list[logging.Handler]] | None" = None
+_worker_log_level = logging.INFO
+
 
 def get_logger(name: str = None) -> logging.Logger:
     """Returns a named logger that inherits from the root logger."""
     if name is None:
-        # Find the caller's file
-        frame = inspect.stack()[1]
-        caller_file = frame.filename
-        name = os.path.basename(caller_file)
+        name = caller_file_name()
     return logging.getLogger(name)
 
 
@@ -34,13 +60,44 @@ def setup_root_logger(log_level=logging.INFO,
                       with_logfile: bool = False,
                       log_folder_path: str = "logs/",
                       log_file_name: str = "app.log",
-                      timestamp_log_file: bool = True) -> None:
-    """Sets up the root logger with console and optional file handlers."""
+                      timestamp_log_file: bool = True,
+                      use_queue: bool = False,
+                      queue_size: int = 10000,
+                      queue_policy: str = "block",
+                      file_format: str = "text",
+                      rotate_bytes: int = 0,
+                      rotate_seconds: float | None = None,
+                      rate_limit: float | None = None,
+                      multiprocess: bool = False,
+                      multiprocess_start_method: str | None = None) -> None:
+    """
+    Sets up the root logger with console and optional file handlers.
+    The "jsonl" file_format writes one JSON object per record through a JsonLinesFileHandler, which rotates the file
+    once it reaches `rotate_bytes` (0 for no limit) or gets older than `rotate_seconds`.
+    With a rate_limit, a RateLimitFilter on the handlers lets through about that many records per second per call site.
+    Its suppressed counts that are still pending are reported when the setup is replaced and at interpreter shutdown.
+    With multiprocess, a background listener takes the records that worker processes set up with setup_worker_logger
+    put on a multiprocessing queue and passes them to the console and file handlers of this process. The queue is
+    created for `multiprocess_start_method` ("fork", "spawn", ...), which must match the one of the worker processes,
+    the platform default if None.
+    With use_queue, the root logger only puts records on a queue of `queue_size` records and a background listener
+    passes them to the console and file handlers. When the queue is full, the "block" policy makes the logging thread
+    wait, "drop_new" discards the new record and "drop_oldest" discards the oldest queued record. The number of dropped
+    records is logged when the listener stops, which happens at interpreter shutdown after flushing the queue.
+    """
+    if queue_policy not in QUEUE_POLICIES:
+        raise ValueError(f"queue_policy must be one of {QUEUE_POLICIES}, got {queue_policy!r}")
+    if file_format not in FILE_FORMATS:
+        raise ValueError(f"file_format must be one of {FILE_FORMATS}, got {file_format!r}")
     root_logger = logging.getLogger()
+    _stop_worker_listener()
+    _stop_queue_listener()
+    _flush_rate_limit_summaries()
 
     # remove existing handlers so we can set up our own
     for handler in logging.root.handlers[:]:
         logging.root.removeHandler(handler)
+        handler.close()
 
     if not root_logger.handlers:
         root_logger.setLevel(log_level)
@@ -51,7 +108,7 @@ def setup_root_logger(log_level=logging.INFO,
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(log_level)
         console_handler.setFormatter(console_formatter)
-        root_logger.addHandler(console_handler)
+        handlers = [console_handler]
 
         # Log file handler
         if with_logfile:
@@ -65,30 +122,250 @@ def setup_root_logger(log_level=logging.INFO,
                 log_file_name = prefix + log_file_name
             log_file_path = os.path.join(log_folder_path, log_file_name)
             # Create and register the file logger
-            file_formatter = IndentMultilineFormatter("%(asctime)s-%(name)s-%(levelname)s: %(message)s",
-                                                      datefmt="%Y-%m-%dT%H:%M:%S")
-            file_handler = logging.FileHandler(log_file_path)
+            if file_format == "jsonl":
+                file_formatter = JsonLinesFormatter()
+                file_handler = JsonLinesFileHandler(log_file_path, rotate_bytes=rotate_bytes,
+                                                    rotate_seconds=rotate_seconds)
+            else:
+                file_formatter = IndentMultilineFormatter("%(asctime)s-%(name)s-%(levelname)s: %(message)s",
+                                                          datefmt="%Y-%m-%dT%H:%M:%S")
+                file_handler = logging.FileHandler(log_file_path)
             file_handler.setLevel(log_level)
             file_handler.setFormatter(file_formatter)
-            root_logger.addHandler(file_handler)
+            handlers.append(file_handler)
+
+        if rate_limit is not None:
+            global _rate_limit
+            rate_limit_filter = RateLimitFilter(rate=rate_limit)
+            _rate_limit = (rate_limit_filter, handlers)
+            for handler in handlers:
+                handler.addFilter(rate_limit_filter)
+
+        if multiprocess:
+            global _worker_listener, _worker_log_level
+            _worker_log_level = log_level
+            worker_queue = multiprocessing.get_context(multiprocess_start_method).Queue()
+            _worker_listener = QueueListener(worker_queue, *handlers, respect_handler_level=True)
+            _worker_listener.start()
+
+        if use_queue:
+            global _queue_listener
+            queue_handler = _BoundedQueueHandler(queue.Queue(queue_size), queue_policy)
+            root_logger.addHandler(queue_handler)
+            _queue_listener = _QueueListener(queue_handler, *handlers)
+            _queue_listener.start()
+        else:
+            for handler in handlers:
+                root_logger.addHandler(handler)
 
         # Optional: prevent logs from being propagated to ancestor loggers
         root_logger.propagate = False
 
 
-class IndentMultilineFormatter(logging.Formatter):
-    """Makes sure multiline log messages are indented properly."""
+def _stop_queue_listener() -> None:
+    """Flush the queue of the current queue based setup, stop its listener and report dropped records."""
+    global _queue_listener
+    listener = _queue_listener
+    if listener is None:
+        return
+    _queue_listener = None
+    logging.getLogger().removeHandler(listener.queue_handler)
+    listener.stop()
+    _flush_rate_limit_summaries()
+    dropped = listener.queue_handler.dropped
+    if dropped:
+        record = logging.LogRecord(__name__, logging.WARNING, __file__, 0,
+                                   "Dropped %d log records because the log queue was full", (dropped,), None)
+        for handler in listener.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+    for handler in listener.handlers:
+        handler.close()
+
+
+def _flush_rate_limit_summaries() -> None:
+    """Give the suppressed counts of the rate limit filter of the current setup to its handlers, before they close."""
+    global _rate_limit
+    if _rate_limit is None:
+        return
+    rate_limit_filter, handlers = _rate_limit
+    _rate_limit = None
+    rate_limit_filter.flush_summaries(handlers)
+
+
+def _stop_worker_listener() -> None:
+    """Pass the records still queued by worker processes to the handlers and stop listening to them."""
+    global _worker_listener
+    listener = _worker_listener
+    if listener is None:
+        return
+    _worker_listener = None
+    listener.stop()
+
+
+def worker_logger_initargs() -> tuple:
+    """Returns the arguments for setup_worker_logger, after setup_root_logger(multiprocess=True)."""
+    if _worker_listener is None:
+        raise RuntimeError("setup_root_logger(multiprocess=True) must be called first")
+    return _worker_listener.queue, _worker_log_level
+
+
+def setup_worker_logger(log_queue: multiprocessing.Queue, log_level=logging.INFO) -> None:
+    """
+    Sets up the root logger of a worker process to only put records on the queue of the parent process listener.
+    Meant as process pool initializer, with worker_logger_initargs() as arguments.
+    """
+    global _queue_listener, _worker_listener, _rate_limit
+    # a forked worker inherits the parent setup, whose handlers and listeners belong to the parent: drop them
+    # without closing, closing would write copies of their buffers
+    _queue_listener = None
+    _worker_listener = None
+    _rate_limit = None
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    root_logger.setLevel(log_level)
+    root_logger.addHandler(_WorkerQueueHandler(log_queue))
+    root_logger.propagate = False
+
+
+# registered after logging's own shutdown hook, so they run first and the handlers are still open,
+# and in reverse order: worker records are passed on, then the queue is flushed, then the pending rate limit counts
+# are reported, before the handlers are closed
+atexit.register(_flush_rate_limit_summaries)
+atexit.register(_stop_queue_listener)
+atexit.register(_stop_worker_listener)
+
+
+class _BoundedQueueHandler(QueueHandler):
+    """QueueHandler for a bounded in-process queue, applying a policy when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue, policy: str):
+        super().__init__(log_queue)
+        self.policy = policy
+        self.dropped = 0
+
+    def prepare(self, record):
+        # the record stays in this process, so unlike QueueHandler.prepare only fix the message, leaving the
+        # formatting and the exception traceback rendering to the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self.policy == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            if self.policy == "drop_new":
+                self.dropped += 1
+                return
+        while True:
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                pass
+
+
+class _WorkerQueueHandler(QueueHandler):
+    """QueueHandler of a worker process, only preparing records so they can be pickled to the parent process."""
+
+    def prepare(self, record):
+        # the parent formats the record, only the message and the traceback are rendered here
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_traceback_formatter = logging.Formatter()
+
+
+class _QueueListener(QueueListener):
+    """QueueListener that remembers its queue handler and waits for room in a full queue to stop."""
+
+    def __init__(self, queue_handler: _BoundedQueueHandler, *handlers: logging.Handler):
+        super().__init__(queue_handler.queue, *handlers, respect_handler_level=True)
+        self.queue_handler = queue_handler
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class _CachedTimeFormatter(logging.Formatter):
+    """Formatter that only renders the timestamp again when the second changes."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (second, datefmt, rendered time) of the last record
+        self._cached_time = (None, None, "")
+
+    def formatTime(self, record, datefmt=None):
+        second = int(record.created)
+        cached_second, cached_datefmt, rendered = self._cached_time
+        if second != cached_second or datefmt != cached_datefmt:
+            rendered = time.strftime(datefmt or self.default_time_format, self.converter(record.created))
+            self._cached_time = (second, datefmt, rendered)
+        if datefmt is None and self.default_msec_format:
+            return self.default_msec_format % (rendered, record.msecs)
+        return rendered
+
+
+class IndentMultilineFormatter(_CachedTimeFormatter):
+    """
+    Makes sure multiline log messages are indented properly.
+    For %-style formats, the part before %(message)s is rendered once per record and its length gives the indent,
+    and the timestamp is only rendered again when the second changes. Single-line messages skip the indenting.
+    """
+
+    def __init__(self, fmt=None, datefmt=None, style="%", *args, **kwargs):
+        super().__init__(fmt, datefmt, style, *args, **kwargs)
+        fmt = self._style._fmt
+        if style == "%" and fmt.count("%(message)s") == 1:
+            self._prefix_fmt, self._suffix_fmt = fmt.split("%(message)s")
+        else:
+            self._prefix_fmt = self._suffix_fmt = None
 
     def format(self, record):
-        original = super().format(record)
-        if '\n' not in record.getMessage():
-            return original
-        # Find the length of the prefix before the message
-        msg = record.getMessage()
-        prefix = original.split(msg, 1)[0]
-        indent = ' ' * len(prefix)
-        lines = original.split('\n')
-        return '\n'.join([lines[0]] + [indent + line for line in lines[1:]])
+        if self._prefix_fmt is None:
+            return self._indent(super().format(record), record.getMessage())
+
+        record.message = message = record.getMessage()
+        if self.usesTime():
+            record.asctime = self.formatTime(record, self.datefmt)
+        defaults = getattr(self._style, "_defaults", None)
+        values = {**defaults, **record.__dict__} if defaults else record.__dict__
+        prefix = self._prefix_fmt % values
+        formatted = prefix + message + self._suffix_fmt % values if self._suffix_fmt else prefix + message
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            formatted = formatted + record.exc_text if formatted.endswith("\n") else f"{formatted}\n{record.exc_text}"
+        if record.stack_info:
+            stack = self.formatStack(record.stack_info)
+            formatted = formatted + stack if formatted.endswith("\n") else f"{formatted}\n{stack}"
+        if "\n" not in message:
+            return formatted
+        return formatted.replace("\n", "\n" + " " * len(prefix))
+
+    @staticmethod
+    def _indent(formatted: str, message: str) -> str:
+        if "\n" not in message:
+            return formatted
+        prefix = formatted.split(message, 1)[0]
+        return formatted.replace("\n", "\n" + " " * len(prefix))
 
 
 class ColorizingFormatter(IndentMultilineFormatter):
@@ -107,3 +384,276 @@ class ColorizingFormatter(IndentMultilineFormatter):
         color = self.COLORS.get(record.levelname, self.RESET)
         return f"{color}{msg}{self.RESET}"
 
+
+
+class JsonLinesFormatter(_CachedTimeFormatter):
+    """Formats a record as a single line JSON object with its time, level, logger name, location and message."""
+    default_msec_format = "%s.%03d"
+
+    def __init__(self, datefmt: str = "%Y-%m-%dT%H:%M:%S"):
+        super().__init__(datefmt=datefmt)
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "name": record.name,
+            "file": record.filename,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+    def formatTime(self, record, datefmt=None):
+        # always with milliseconds, the seconds part is cached
+        rendered = super().formatTime(record, self.datefmt)
+        return self.default_msec_format % (rendered, record.msecs)
+
+
+class JsonLinesFileHandler(logging.Handler):
+    """
+    Writes formatted records as lines to a file through a write buffer, flushed once it holds `buffer_bytes`, once its
+    oldest line is `flush_seconds` old, or right away for records of `flush_level` and above.
+    The file is rotated when it would grow beyond `rotate_bytes` (0 for no limit) or is older than `rotate_seconds`:
+    it is renamed with a timestamp suffix and, with `compress`, gzipped on a background thread. That thread also
+    flushes the buffer when no new records come in.
+    """
+
+    def __init__(self,
+                 path: str,
+                 buffer_bytes: int = 64 * 1024,
+                 flush_seconds: float = 1.0,
+                 flush_level: int = logging.ERROR,
+                 rotate_bytes: int = 0,
+                 rotate_seconds: float | None = None,
+                 compress: bool = True):
+        super().__init__()
+        self.setFormatter(JsonLinesFormatter())
+        self.path = os.path.abspath(path)
+        self.buffer_bytes = buffer_bytes
+        self.flush_seconds = flush_seconds
+        self.flush_level = flush_level
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.compress = compress
+        self._buffer: list[str] = []
+        self._buffered_bytes = 0
+        self._buffered_since = 0.0
+        self._open()
+        # rotated files to compress, None stops the worker
+        self._jobs: queue.Queue[str | None] = queue.Queue()
+        self._worker = threading.Thread(target=self._work, name="JsonLinesFileHandler", daemon=True)
+        self._worker.start()
+
+    def _open(self) -> None:
+        self._stream = open(self.path, "a", encoding="utf-8")
+        self._size = self._stream.tell()
+        self._opened_at = time.time()
+
+    def emit(self, record):
+        try:
+            line = self.format(record) + "\n"
+            if not self._buffer:
+                self._buffered_since = time.monotonic()
+            self._buffer.append(line)
+            # close enough to the byte count for non-ascii text, without encoding twice
+            self._buffered_bytes += len(line)
+            if (self._buffered_bytes >= self.buffer_bytes or record.levelno >= self.flush_level
+                    or time.monotonic() - self._buffered_since >= self.flush_seconds):
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        with self.lock:
+            if not self._buffer or self._stream is None:
+                return
+            if self._should_rotate():
+                self._rotate()
+            data = "".join(self._buffer)
+            self._buffer = []
+            self._buffered_bytes = 0
+            self._stream.write(data)
+            self._stream.flush()
+            self._size = self._stream.tell()
+
+    def _should_rotate(self) -> bool:
+        if self._size == 0:
+            return False
+        if self.rotate_bytes and self._size + self._buffered_bytes > self.rotate_bytes:
+            return True
+        return self.rotate_seconds is not None and time.time() - self._opened_at >= self.rotate_seconds
+
+    def _rotate(self) -> None:
+        self._stream.close()
+        date_str, time_str = get_current_date_and_time_str("%Y-%m-%d", "%H-%M-%S")
+        rotated = f"{self.path}.{date_str}_{time_str}"
+        counter = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + ".gz"):
+            rotated = f"{self.path}.{date_str}_{time_str}.{counter}"
+            counter += 1
+        os.replace(self.path, rotated)
+        self._open()
+        if self.compress:
+            self._jobs.put(rotated)
+
+    def _work(self) -> None:
+        while True:
+            try:
+                rotated = self._jobs.get(timeout=self.flush_seconds)
+            except queue.Empty:
+                if self._buffer and time.monotonic() - self._buffered_since >= self.flush_seconds:
+                    self._idle_flush()
+                continue
+            if rotated is None:
+                return
+            try:
+                with open(rotated, "rb") as source, gzip.open(rotated + ".gz", "wb") as target:
+                    shutil.copyfileobj(source, target)
+                os.remove(rotated)
+            except OSError as error:
+                # not through logging, which could end up in this handler again
+                sys.stderr.write(f"Could not compress rotated log file {rotated}: {error}\n")
+
+    def _idle_flush(self) -> None:
+        """Flush from the worker, without waiting for the lock indefinitely."""
+        # close() may be waiting for this thread while its caller holds the lock, as logging.shutdown does, so give up
+        # the lock after a while: the loop comes back to the stop signal, and close() flushes itself
+        if not self.lock.acquire(timeout=min(self.flush_seconds, 0.1)):
+            return
+        try:
+            if self._stream is not None:
+                self.flush()
+        finally:
+            self.lock.release()
+
+    def close(self):
+        with self.lock:
+            if self._stream is None:
+                return
+            self.flush()
+            self._stream.close()
+            self._stream = None
+        # let the pending compressions finish, the worker never waits for the lock, which may still be held here
+        self._jobs.put(None)
+        self._worker.join()
+        super().close()
+
+
+class _CallSite:
+    """Token bucket and suppression counts of one logging call site."""
+    __slots__ = ("tokens", "updated", "summarized_at", "allowed_at", "suppressed", "last_msg", "last_args",
+                 "last_suppressed")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated = now
+        self.summarized_at = now
+        # when the last record was let through, the start of the window in which repeats of it are dropped
+        self.allowed_at = now
+        self.suppressed = 0
+        self.last_msg = None
+        self.last_args = None
+        self.last_suppressed = None
+
+
+def _same(value, other) -> bool:
+    """Identity, else equality, where a failing or ambiguous comparison (e.g. of numpy arrays) counts as different."""
+    if value is other:
+        return True
+    try:
+        return bool(value == other)
+    except Exception:
+        return False
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Rate limits records per call site (logger name, pathname, lineno) with a token bucket of `burst` records refilled
+    at `rate` records per second. With collapse_duplicates, a record with the same message and arguments as the last
+    one let through from its call site is dropped until `summary_seconds` after that one.
+    The first record let through from a call site at least `summary_seconds` after its last summary gets
+    " (suppressed N similar messages)" appended to its message and the count in its `suppressed` attribute.
+    flush_summaries(handlers) gives the remaining counts to handlers directly, e.g. at shutdown.
+    A record is only judged once, so the same filter can be added to several handlers. Add it to the handlers rather
+    than to a logger, whose filters do not see records of child loggers.
+    """
+
+    def __init__(self,
+                 rate: float = 10.0,
+                 burst: int = 20,
+                 collapse_duplicates: bool = True,
+                 summary_seconds: float = 10.0):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.collapse_duplicates = collapse_duplicates
+        self.summary_seconds = summary_seconds
+        # no lock: a race between threads logging from the same call site can only skew its counts a little
+        self._sites: dict[tuple[str, str, int], _CallSite] = {}
+
+    def filter(self, record):
+        allowed = record.__dict__.get("_rate_limit_allowed")
+        if allowed is not None:
+            return allowed
+        now = time.monotonic()
+        key = (record.name, record.pathname, record.lineno)
+        site = self._sites.get(key)
+        if site is None:
+            site = self._sites[key] = _CallSite(self.burst, now)
+
+        tokens = site.tokens + (now - site.updated) * self.rate
+        if tokens > self.burst:
+            tokens = self.burst
+        site.updated = now
+        allowed = tokens >= 1 and not (
+            self.collapse_duplicates
+            and now - site.allowed_at < self.summary_seconds
+            and _same(record.msg, site.last_msg)
+            and _same(record.args, site.last_args)
+        )
+        if allowed:
+            site.tokens = tokens - 1
+            site.allowed_at = now
+            site.last_msg = record.msg
+            site.last_args = record.args
+            if site.suppressed and now - site.summarized_at >= self.summary_seconds:
+                # folded into this record: logging a separate one from a handler filter could re-enter the handlers,
+                # e.g. the queue handler from the listener thread of setup_root_logger(use_queue=True)
+                record.msg = f"{record.getMessage()} (suppressed {site.suppressed} similar messages)"
+                record.args = None
+                record.suppressed = site.suppressed
+                site.suppressed = 0
+                site.summarized_at = now
+                site.last_suppressed = None
+        else:
+            site.tokens = tokens
+            site.suppressed += 1
+            site.last_suppressed = record
+        record._rate_limit_allowed = allowed
+        return allowed
+
+    def flush_summaries(self, handlers: list[logging.Handler]) -> None:
+        """Give a "Suppressed N similar messages" record per call site with unreported counts to the handlers."""
+        now = time.monotonic()
+        for site in list(self._sites.values()):
+            if not site.suppressed:
+                continue
+            suppressed = site.last_suppressed
+            summary = logging.LogRecord(suppressed.name, suppressed.levelno, suppressed.pathname, suppressed.lineno,
+                                        "Suppressed %d similar messages", (site.suppressed,), None,
+                                        suppressed.funcName)
+            summary.suppressed = site.suppressed
+            summary._rate_limit_allowed = True
+            site.suppressed = 0
+            site.summarized_at = now
+            site.last_suppressed = None
+            for handler in handlers:
+                if summary.levelno >= handler.level:
+                    handler.handle(summary)
@@ -1,7 +1,7 @@
-import os
-import inspect
 import shutil
 
+from pyutils.frames import caller_file_name
+
 __all__ = [
     "title",
     "subtitle",
@@ -40,10 +40,7 @@ def title(title: str = None, width: int = 0) -> str:
     ==============================
     """
     if title is None:
-        # Find the caller's file
-        frame = inspect.stack()[1]
-        caller_file = frame.filename
-        title = os.path.basename(caller_file)
+        title = caller_file_name()
 
     text_induced_width = len(title) + 8
     banner_width = _select_width(width, text_induced_width)
@@ -0,0 +1,255 @@
+"""
+Timing of code sections into latency histograms, summarized through the logger.
+
+Usage:
+- @timed() or @timed("label") records the duration of every call of a function
+- with Timer("label"): records the duration of a block
+- timer = Timer("label"); timer.start(); ...; timer.stop() records the time between start and stop
+- report_timings() logs count, mean, p50, p95, p99 and max per label
+- configure_timing(report_interval=60) also logs (and resets) the summaries every minute
+- configure_timing(enabled=False) turns all timing into a flag check
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from functools import wraps
+
+from pyutils.logger import get_logger
+
+__all__ = [
+    "LatencyHistogram",
+    "Timer",
+    "timed",
+    "get_histogram",
+    "configure_timing",
+    "report_timings",
+    "reset_timings",
+]
+
+# durations below 2**_SUB_BUCKET_BITS * 2 ns get a bucket each, longer ones 2**_SUB_BUCKET_BITS buckets per doubling
+_SUB_BUCKET_BITS = 4
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+# up to 2**44 ns, almost 5 hours, longer durations land in the last bucket
+_BUCKET_COUNT = (44 - _SUB_BUCKET_BITS + 1) * _SUB_BUCKETS
+_NS_PER_SECOND = 1_000_000_000
+
+_histograms: dict[str, "LatencyHistogram"] = {}
+_histograms_lock = threading.Lock()
+_enabled = True
+_report_interval_ns: int | None = None
+_next_report_ns: int | None = None
+_logger_name = "pyutils.timing"
+_report_level = logging.INFO
+
+
+def _bucket_index(ns: int) -> int:
+    if ns < 2 * _SUB_BUCKETS:
+        return max(ns, 0)
+    # keep the top _SUB_BUCKET_BITS + 1 bits, the leading one marks the doubling
+    shift = ns.bit_length() - _SUB_BUCKET_BITS - 1
+    return min(shift * _SUB_BUCKETS + (ns >> shift), _BUCKET_COUNT - 1)
+
+
+def _bucket_bounds(index: int) -> tuple[int, int]:
+    """Smallest and largest duration in ns of a bucket."""
+    if index < 2 * _SUB_BUCKETS:
+        return index, index
+    shift, top = divmod(index, _SUB_BUCKETS)
+    shift -= 1
+    top += _SUB_BUCKETS
+    return top << shift, ((top + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Thread-safe histogram of durations in fixed buckets, about 6% wide, from 1 ns up to hours.
+    Recording is an index computation and a counter increment; percentiles are read from the bucket counts and are
+    accurate to the bucket width, while count, mean and max are exact.
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * _BUCKET_COUNT
+            self.count = self.total_ns = self.max_ns = 0
+
+    def record_ns(self, ns: int) -> None:
+        index = _bucket_index(ns)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total_ns += ns
+            if ns > self.max_ns:
+                self.max_ns = ns
+
+    def percentile(self, q: float) -> float:
+        """Duration in seconds below which a fraction `q` of the recorded durations lies, 0 if nothing was recorded."""
+        with self._lock:
+            return _percentile(self._counts, self.count, self.max_ns, q)
+
+    def summary(self, reset: bool = False) -> dict:
+        """Count and mean, p50, p95, p99 and max durations in seconds, of one consistent snapshot."""
+        with self._lock:
+            counts, count, total_ns, max_ns = self._counts, self.count, self.total_ns, self.max_ns
+            if reset:
+                self._counts = [0] * _BUCKET_COUNT
+                self.count = self.total_ns = self.max_ns = 0
+            else:
+                counts = counts[:]
+        return {
+            "count": count,
+            "mean": total_ns / count / _NS_PER_SECOND if count else 0.0,
+            "p50": _percentile(counts, count, max_ns, 0.5),
+            "p95": _percentile(counts, count, max_ns, 0.95),
+            "p99": _percentile(counts, count, max_ns, 0.99),
+            "max": max_ns / _NS_PER_SECOND,
+        }
+
+
+def _percentile(counts: list[int], count: int, max_ns: int, q: float) -> float:
+    """Percentile in seconds from bucket counts, taking the middle of the bucket it falls in."""
+    if not count:
+        return 0.0
+    rank = max(1, round(q * count))
+    seen = 0
+    for index, bucket_count in enumerate(counts):
+        seen += bucket_count
+        if seen >= rank:
+            low, high = _bucket_bounds(index)
+            return min((low + high) / 2, max_ns) / _NS_PER_SECOND
+    return max_ns / _NS_PER_SECOND
+
+
+def get_histogram(label: str) -> LatencyHistogram:
+    """Returns the histogram of a label, creating it on first use."""
+    histogram = _histograms.get(label)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(label, LatencyHistogram(label))
+    return histogram
+
+
+def _record(histogram: LatencyHistogram, start_ns: int, end_ns: int) -> None:
+    histogram.record_ns(end_ns - start_ns)
+    if _next_report_ns is not None and end_ns >= _next_report_ns:
+        _report_due(end_ns)
+
+
+class Timer:
+    """
+    Labelled timer recording into the histogram of its label, as a context manager or with start and stop.
+    One Timer times one thing at a time, so create one per use (or per thread) when timing concurrent code.
+    While timing is disabled, start and stop only check a flag and nothing is recorded.
+    """
+    __slots__ = ("label", "_histogram", "_start_ns")
+
+    def __init__(self, label: str):
+        self.label = label
+        self._histogram = None
+        self._start_ns = None
+
+    def start(self) -> "Timer":
+        self._start_ns = time.perf_counter_ns() if _enabled else None
+        return self
+
+    def stop(self) -> float | None:
+        """Record and return the duration in seconds since start, or None when timing was disabled at start."""
+        if self._start_ns is None:
+            return None
+        end_ns = time.perf_counter_ns()
+        if self._histogram is None:
+            self._histogram = get_histogram(self.label)
+        _record(self._histogram, self._start_ns, end_ns)
+        duration = (end_ns - self._start_ns) / _NS_PER_SECOND
+        self._start_ns = None
+        return duration
+
+    def __enter__(self) -> "Timer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+
+def timed(label: str = None) -> Callable:
+    """Decorator recording the duration of every call, labelled with the function's qualified name by default."""
+
+    def decorator(func: Callable) -> Callable:
+        histogram = get_histogram(label or f"{func.__module__}.{func.__qualname__}")
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start_ns = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(histogram, start_ns, time.perf_counter_ns())
+
+        return wrapper
+
+    return decorator
+
+
+def configure_timing(enabled: bool = True,
+                     report_interval: float | None = None,
+                     logger_name: str = "pyutils.timing",
+                     level: int = logging.INFO) -> None:
+    """
+    Turns timing on or off and sets where and how often summaries are logged.
+    With a report_interval in seconds, the first timing that ends after each interval logs the summaries of all labels
+    and resets them, so every report covers one interval. Without one, summaries are only logged by report_timings.
+    """
+    global _enabled, _report_interval_ns, _next_report_ns, _logger_name, _report_level
+    _enabled = enabled
+    _logger_name = logger_name
+    _report_level = level
+    if report_interval is None:
+        _report_interval_ns = _next_report_ns = None
+    else:
+        _report_interval_ns = int(report_interval * _NS_PER_SECOND)
+        _next_report_ns = time.perf_counter_ns() + _report_interval_ns
+
+
+def _report_due(now_ns: int) -> None:
+    global _next_report_ns
+    with _histograms_lock:
+        # another thread may have reported already
+        if _next_report_ns is None or now_ns < _next_report_ns:
+            return
+        _next_report_ns = now_ns + _report_interval_ns
+    report_timings(reset=True)
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.3f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f}ms"
+    return f"{seconds * 1e6:.3f}us"
+
+
+def report_timings(reset: bool = False) -> dict[str, dict]:
+    """Logs the summary of every label with recorded durations and returns the summaries by label."""
+    logger = get_logger(_logger_name)
+    summaries = {}
+    for label, histogram in sorted(list(_histograms.items())):
+        if not histogram.count:
+            continue
+        summary = summaries[label] = histogram.summary(reset)
+        logger.log(_report_level, "%s: n=%d mean=%s p50=%s p95=%s p99=%s max=%s", label, summary["count"],
+                   *(_format_duration(summary[key]) for key in ("mean", "p50", "p95", "p99", "max")))
+    return summaries
+
+
+def reset_timings() -> None:
+    """Forgets the recorded durations of all labels."""
+    for histogram in list(_histograms.values()):
+        histogram.reset()
@@ -1,10 +1,138 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
+import polars as pl
 
 __all__ = [
     "detect_vector_interpolation",
+    "detect_vector_interpolation_batch",
+    "detect_vector_interpolation_chunked",
+    "InterpolationDetector",
+    "scan_vector_quality",
 ]
 
-def detect_vector_interpolation(vector: np.ndarray, sequence_length: int=5, tolerance=1e-5) -> (bool, np.ndarray):
+# default number of values processed at once in batch mode
+CHUNK_ELEMENTS = 65536
+
+# output formats of the detected segments, and the row layout of the "segments" format
+OUTPUTS = ("mask", "bool", "packed", "segments")
+SEGMENT_DTYPE = np.dtype([("start", np.int64), ("end", np.int64), ("step", np.float64)])
+_EMPTY = np.empty(0, dtype=np.int64)
+_NO_SEGMENTS = np.empty(0, dtype=SEGMENT_DTYPE)
+_NO_SEGMENTS.setflags(write=False)
+
+
+def _step_run_breaks(steps: np.ndarray, tolerance, forced: np.ndarray | None = None) -> np.ndarray:
+    """
+    Return a boolean array marking the steps that start a new run of (nearly) equal steps.
+    Steps marked in `forced` always start a new run, which allows several series to be processed back to back.
+
+    A step continues the current run if it is within tolerance of the first step of that run (the anchor),
+    which makes the result inherently sequential. It is computed vectorized by guessing the runs from consecutive
+    steps, verifying every step against the anchor of its guessed run, and only re-evaluating the few inconsistent
+    places one step at a time until they agree with the guess again.
+    """
+    n_steps = len(steps)
+    breaks = np.ones(n_steps, dtype=bool)
+    if n_steps <= 1:
+        return breaks
+
+    # guess: a run continues as long as consecutive steps are within tolerance
+    breaks[1:] = ~(np.abs(steps[1:] - steps[:-1]) < tolerance)
+    if forced is not None:
+        breaks |= forced
+
+    # verify: continuing steps must be close to their anchor, breaking steps must not be close to the previous anchor.
+    # Only steps following a continuing step need it, otherwise the anchor is the previous step and the guess holds.
+    starts = np.flatnonzero(breaks)
+    checked = np.flatnonzero(~breaks[1:-1]) + 2
+    previous_anchors = starts[np.searchsorted(starts, checked - 1, side="right") - 1]
+    continues = np.abs(steps[checked] - steps[previous_anchors]) < tolerance
+    if forced is not None:
+        continues &= ~forced[checked]
+    inconsistent_at = continues == breaks[checked]
+    if not inconsistent_at.any():
+        return breaks
+    inconsistent = checked[inconsistent_at]
+    inconsistent_anchors = previous_anchors[inconsistent_at]
+
+    # repair: replay sequentially from the anchor before an inconsistency until a guessed break is confirmed
+    guessed = breaks.copy()
+    resume = 0
+    for position, anchor in zip(inconsistent, inconsistent_anchors):
+        if position < resume:
+            continue
+        index = anchor + 1
+        while index < n_steps:
+            is_break = (forced is not None and forced[index]) or not (abs(steps[index] - steps[anchor]) < tolerance)
+            breaks[index] = is_break
+            if is_break:
+                anchor = index
+                if index > position and guessed[index]:
+                    break
+            index += 1
+        resume = index + 1
+    return breaks
+
+
+def _interpolated_segments(breaks: np.ndarray, sequence_length: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Turn the run breaks of the steps into the interpolated segments of the vector.
+
+    A run of L steps covers L + 1 values and is an interpolated segment if L + 1 >= sequence_length.
+
+    Returns:
+        tuple: Start and (exclusive) end value indices of the interpolated segments.
+    """
+    starts = np.flatnonzero(breaks)
+    ends = np.append(starts[1:], len(breaks)) + 1
+    keep = ends - starts >= sequence_length
+    return starts[keep], ends[keep]
+
+
+def _segments_to_mask(starts: np.ndarray, ends: np.ndarray, length: int) -> np.ndarray:
+    """Build a bool mask of the given length that is True inside the sorted (possibly touching) segments."""
+    # segments only ever share their boundary value, so the coverage count stays within 0..2
+    coverage = np.zeros(length + 1, dtype=np.int8)
+    np.add.at(coverage, starts, 1)
+    np.add.at(coverage, ends, -1)
+    return np.cumsum(coverage[:-1], dtype=np.int8) > 0
+
+
+def _true_runs(flags: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return the start and (exclusive) end indices of the runs of True in a bool array."""
+    edges = np.diff(np.concatenate(([False], flags, [False])).view(np.int8))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _segment_table(starts: np.ndarray, ends: np.ndarray, steps: np.ndarray) -> np.ndarray:
+    """Build a structured array with a (start, end, step) row per segment."""
+    table = np.empty(len(starts), dtype=SEGMENT_DTYPE)
+    table["start"], table["end"], table["step"] = starts, ends, steps
+    return table
+
+
+def _format_segments(starts: np.ndarray, ends: np.ndarray, steps: np.ndarray, length: int, output: str) -> np.ndarray:
+    """Render interpolated segments in the requested output format, see `detect_vector_interpolation`."""
+    if output == "segments":
+        return _segment_table(starts, ends, steps)
+    mask = _segments_to_mask(starts, ends, length)
+    if output == "bool":
+        return mask
+    if output == "packed":
+        return np.packbits(mask)
+    return mask.astype(int)
+
+
+def _check_output(output: str) -> None:
+    """Validate the requested output format."""
+    if output not in OUTPUTS:
+        raise ValueError(f"output must be one of {OUTPUTS}. Found: {output}")
+
+
+def detect_vector_interpolation(vector: np.ndarray, sequence_length: int=5, tolerance=1e-5,
+                                output: str = "mask") -> (bool, np.ndarray):
     """
     Detects if a vector contains at least one segment of linear interpolation of at least sequence_length.
     A segment is considered linearly interpolated if the difference between consecutive elements
@@ -13,6 +141,11 @@ def detect_vector_interpolation(vector: np.ndarray, sequence_length: int=5, tole
         vector (np.ndarray): The input vector to analyze.
         sequence_length (int): The minimum length of a linear interpolation segment to detect.
         tolerance (float): The tolerance within which differences are considered equal.
+        output (str): The format of the second element of the result:
+            - "mask": an int mask, as described below (default)
+            - "bool": a bool mask, 1 byte per value
+            - "packed": a bit-packed bool mask from np.packbits, use np.unpackbits(mask, count=len(vector))
+            - "segments": a structured array with a (start, end, step) row per segment, `end` being exclusive
     Returns:
         tuple: A tuple containing:
             - bool: True if at least one interpolated segment of at least sequence_length is found
@@ -25,40 +158,320 @@ def detect_vector_interpolation(vector: np.ndarray, sequence_length: int=5, tole
         raise ValueError("vector is None")
     if sequence_length <= 2:
         raise ValueError('sequence_length must be greater than 2')
+    _check_output(output)
     if len(vector) < sequence_length:
-        return False, np.zeros(len(vector), dtype=int)
+        return False, _format_segments(_EMPTY, _EMPTY, _EMPTY, len(vector), output)
 
-    has_interpolated_segment = False
-    mask = np.zeros(len(vector), dtype=int)
-    current_sequence_length = 2
-    for i, value in enumerate(vector):
-        if i == 0:
-            continue
+    # runs of steps that stay within tolerance of the first step of the run are interpolated segments
+    vector = np.asarray(vector)
+    steps = np.diff(vector)
+    breaks = _step_run_breaks(steps, tolerance)
+    starts, ends = _interpolated_segments(breaks, sequence_length)
+    return bool(starts.size), _format_segments(starts, ends, steps[starts], len(vector), output)
 
-        current_step = value - vector[i - 1]
 
-        # skip ahead for first value, no previous step to compare to
-        if i == 1:
-            previous_step = current_step
-            continue
+def detect_vector_interpolation_chunked(vector: np.ndarray, sequence_length: int = 5, tolerance=1e-5,
+                                        chunk_size: int = 1 << 20, output: str = "segments") -> (bool, np.ndarray):
+    """
+    Chunked counterpart of `detect_vector_interpolation` for vectors too large to process at once, e.g. an np.memmap.
+    Only `chunk_size` values are read and processed at a time, by pushing them into an `InterpolationDetector`.
+    The segment that is still open at the end of a chunk (its start and first step) is carried into the next chunk,
+    so a segment spanning chunks is reported exactly once.
+    Args:
+        vector (np.ndarray): The input vector to analyze, anything that supports len() and slicing.
+        sequence_length (int): The minimum length of a linear interpolation segment to detect.
+        tolerance (float): The tolerance within which differences are considered equal.
+        chunk_size (int): The number of values read per chunk.
+        output (str): The format of the second element of the result, see `detect_vector_interpolation`.
+            Default is "segments", the only format that does not grow with the length of the vector.
+    Returns:
+        tuple: A tuple containing:
+            - bool: True if at least one interpolated segment of at least sequence_length is found
+            - np.ndarray: The segments or mask in the requested output format.
+    """
+    if vector is None:
+        raise ValueError("vector is None")
+    if sequence_length <= 2:
+        raise ValueError('sequence_length must be greater than 2')
+    if chunk_size <= 0:
+        raise ValueError('chunk_size must be positive')
+    _check_output(output)
+
+    detector = InterpolationDetector(sequence_length, tolerance)
+    found = [detector.push_many(vector[start:start + chunk_size]) for start in range(0, len(vector), chunk_size)]
+    segments = np.concatenate(found + [detector.close()])
+    return bool(segments.size), _format_segments(segments["start"], segments["end"], segments["step"], len(vector),
+                                                 output)
+
+
+class InterpolationDetector:
+    """
+    Push-based counterpart of `detect_vector_interpolation` for live data.
+    Values are pushed one by one or in small batches, and every call returns the interpolated segments that were
+    closed by the pushed values, as a structured array with a (start, end, step) row per segment (see
+    SEGMENT_DTYPE). Indices count all values pushed so far. Only the previous value and the start and first step of
+    the open run are kept, so the work per value is constant. Call `close` at the end of the stream to get the
+    segment that is still open, just like the tail segment of `detect_vector_interpolation`.
+    Example:
+        detector = InterpolationDetector(sequence_length=5)
+        for value in stream:
+            for start, end, step in detector.push(value):
+                ...
+    """
+
+    def __init__(self, sequence_length: int = 5, tolerance=1e-5):
+        if sequence_length <= 2:
+            raise ValueError('sequence_length must be greater than 2')
+        self.sequence_length = sequence_length
+        self.tolerance = tolerance
+        self._reset()
+
+    def _reset(self) -> None:
+        self._count = 0
+        self._previous = None
+        # value index and first step of the open run
+        self._run_start = None
+        self._run_step = None
+
+    def _close_run(self, end: int) -> np.ndarray:
+        """Return the open run as a segment if it ends at `end` and is long enough."""
+        if self._run_start is None or end - self._run_start < self.sequence_length:
+            return _NO_SEGMENTS
+        return np.array([(self._run_start, end, self._run_step)], dtype=SEGMENT_DTYPE)
+
+    def push(self, value) -> np.ndarray:
+        """Push a single value and return the segments it closed."""
+        index = self._count
+        self._count += 1
+        if self._previous is None:
+            self._previous = value
+            return _NO_SEGMENTS
+        step = value - self._previous
+        self._previous = value
+        if self._run_step is None:
+            self._run_start, self._run_step = index - 1, step
+            return _NO_SEGMENTS
+        if abs(step - self._run_step) < self.tolerance:
+            return _NO_SEGMENTS
+
+        closed = self._close_run(index)
+        self._run_start, self._run_step = index - 1, step
+        return closed
+
+    def push_many(self, values: np.ndarray) -> np.ndarray:
+        """Push a batch of values, processed vectorized, and return the segments they closed."""
+        values = np.asarray(values)
+        if values.size == 0:
+            return _NO_SEGMENTS
+        # global index of the first step in this batch
+        first_step = max(self._count - 1, 0)
+        self._count += values.size
+        if self._previous is not None:
+            values = np.concatenate(([self._previous], values))
+        self._previous = values[-1]
+        steps = np.diff(values)
+        if steps.size == 0:
+            return _NO_SEGMENTS
+
+        # the open run continues as long as the steps stay within tolerance of its first step, so start from it
+        carried = self._run_step is not None
+        if carried:
+            steps = np.concatenate(([self._run_step], steps))
+        starts = np.flatnonzero(_step_run_breaks(steps, self.tolerance))
+        run_steps = steps[starts]
+        starts = starts + first_step - carried
+        if carried:
+            starts[0] = self._run_start
+
+        # every run but the last one is closed by the next one, the last one stays open
+        ends = starts[1:] + 1
+        keep = ends - starts[:-1] >= self.sequence_length
+        self._run_start, self._run_step = starts[-1], run_steps[-1]
+        return _segment_table(starts[:-1][keep], ends[keep], run_steps[:-1][keep])
+
+    def close(self) -> np.ndarray:
+        """End the stream: return the segment that is still open, if long enough, and start over."""
+        closed = self._close_run(self._count)
+        self._reset()
+        return closed
+
+
+def scan_vector_quality(vector: np.ndarray, sequence_length: int = 5, tolerance=1e-5,
+                        step_threshold: float | None = None) -> dict[str, np.ndarray]:
+    """
+    Scans a vector for several data quality patterns at once, deriving them all from a single computation of the
+    steps between consecutive values and their run-length structure.
+    Args:
+        vector (np.ndarray): The input vector to analyze.
+        sequence_length (int): The minimum length of an interpolation or flatline segment.
+        tolerance (float): The tolerance within which differences are considered equal.
+        step_threshold (float | None): The absolute step above which a step is a sudden step change.
+            Default is None, which does not look for step changes.
+    Returns:
+        dict: A structured array (see SEGMENT_DTYPE) with a (start, end, step) row per segment, `end` being
+              exclusive, for each of the patterns:
+            - "interpolation": linear interpolation, as found by `detect_vector_interpolation`
+            - "flatline": interpolation segments whose step is zero within tolerance
+            - "repeated": runs of at least 2 exactly equal consecutive values
+            - "step_change": pairs of consecutive values whose step exceeds step_threshold in absolute value
+            - "nan": runs of NaN values, with a NaN step
+    """
+    if vector is None:
+        raise ValueError("vector is None")
+    if sequence_length <= 2:
+        raise ValueError('sequence_length must be greater than 2')
+
+    vector = np.asarray(vector)
+    steps = np.diff(vector)
+    report = {}
+
+    if len(vector) < sequence_length:
+        starts, ends = _EMPTY, _EMPTY
+    else:
+        starts, ends = _interpolated_segments(_step_run_breaks(steps, tolerance), sequence_length)
+    run_steps = steps[starts]
+    report["interpolation"] = _segment_table(starts, ends, run_steps)
+    flat = np.abs(run_steps) < tolerance
+    report["flatline"] = _segment_table(starts[flat], ends[flat], run_steps[flat])
+
+    # runs of zero steps cover one value more than they hold steps
+    starts, ends = _true_runs(steps == 0)
+    report["repeated"] = _segment_table(starts, ends + 1, np.zeros(len(starts)))
+
+    if step_threshold is None:
+        starts = _EMPTY
+    else:
+        starts = np.flatnonzero(np.abs(steps) > step_threshold)
+    report["step_change"] = _segment_table(starts, starts + 2, steps[starts])
+
+    if np.issubdtype(vector.dtype, np.floating):
+        starts, ends = _true_runs(np.isnan(vector))
+    else:
+        starts, ends = _EMPTY, _EMPTY
+    report["nan"] = _segment_table(starts, ends, np.full(len(starts), np.nan))
+    return report
+
+
+def _detect_rows_interpolation(rows: np.ndarray, sequence_length: int, tolerance) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Detect interpolated segments in every row of a 2-D array in one vectorized pass.
+
+    The rows are processed back to back as one long vector of steps, with a forced run break at the first step of
+    every row so no run crosses from one series into the next.
+    """
+    n_rows, n_values = rows.shape
+    flags = np.zeros(n_rows, dtype=bool)
+    if n_values < sequence_length:
+        return flags, np.zeros(rows.shape, dtype=bool)
+
+    n_steps = n_values - 1
+    forced = np.zeros(n_rows * n_steps, dtype=bool)
+    forced[::n_steps] = True
+    breaks = _step_run_breaks(np.diff(rows, axis=1).ravel(), tolerance, forced)
+    starts, ends = _interpolated_segments(breaks, sequence_length)
+
+    # convert step indices to value indices: every row holds one value more than it holds steps
+    segment_rows = starts // n_steps
+    flags[segment_rows] = True
+    mask = _segments_to_mask(starts + segment_rows, ends + segment_rows, n_rows * n_values)
+    return flags, mask.reshape(rows.shape)
+
+
+def detect_vector_interpolation_batch(
+        data: np.ndarray | pl.DataFrame,
+        sequence_length: int = 5,
+        tolerance=1e-5,
+        axis: int = -1,
+        chunk_size: int | None = None,
+        max_workers: int | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Batch counterpart of `detect_vector_interpolation` for many series of equal length at once.
+    The series are processed in chunks of `chunk_size` series, spread over a thread pool when there is more than
+    one chunk, so the working memory is bounded by the chunk size rather than by the full input.
+    Args:
+        data (np.ndarray | pl.DataFrame): A 2-D array (also np.memmap), or a DataFrame with one series per column.
+        sequence_length (int): The minimum length of a linear interpolation segment to detect.
+        tolerance (float): The tolerance within which differences are considered equal.
+        axis (int): The array axis along which the values of a single series run. Ignored for a DataFrame.
+        chunk_size (int | None): The number of series processed at once by a worker. Default picks the number of
+            series that keeps a chunk around CHUNK_ELEMENTS values, small enough to stay in the CPU cache.
+        max_workers (int | None): The maximum number of worker threads. Default is the number of CPUs.
+    Returns:
+        tuple: A tuple containing:
+            - np.ndarray: A bool array with one flag per series, True if it has an interpolated segment.
+            - np.ndarray: A bool mask with the shape of the input (rows x columns for a DataFrame),
+                          True for positions that are part of an interpolated segment.
+    """
+    if data is None:
+        raise ValueError("data is None")
+    if sequence_length <= 2:
+        raise ValueError('sequence_length must be greater than 2')
+    if chunk_size is not None and chunk_size <= 0:
+        raise ValueError('chunk_size must be positive')
+
+    if isinstance(data, pl.DataFrame):
+        n_series, n_values = data.width, data.height
+        columns = data.columns
+
+        def read_chunk(start: int, stop: int) -> np.ndarray:
+            return data.select(columns[start:stop]).to_numpy().T
+    else:
+        if np.ndim(data) != 2:
+            raise ValueError(f"data must be 2-dimensional. Found: {np.ndim(data)} dimensions")
+        # view with one series per row, slicing it only reads the chunk (also for np.memmap)
+        series = np.moveaxis(data, axis, -1)
+        n_series, n_values = series.shape
+
+        def read_chunk(start: int, stop: int) -> np.ndarray:
+            return np.asarray(series[start:stop])
+
+    flags = np.zeros(n_series, dtype=bool)
+    mask = np.zeros((n_series, n_values), dtype=bool)
+    if chunk_size is None:
+        chunk_size = max(1, CHUNK_ELEMENTS // max(n_values, 1))
+
+    def process_chunk(start: int) -> None:
+        stop = min(start + chunk_size, n_series)
+        flags[start:stop], mask[start:stop] = _detect_rows_interpolation(read_chunk(start, stop), sequence_length,
+                                                                          tolerance)
+
+    chunk_starts = range(0, n_series, chunk_size)
+    max_workers = max_workers or os.cpu_count() or 1
+    if len(chunk_starts) > 1 and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # consume the results to surface exceptions raised in the workers
+            list(executor.map(process_chunk, chunk_starts))
+    else:
+        for start in chunk_starts:
+            process_chunk(start)
+
+    if isinstance(data, pl.DataFrame):
+        return flags, mask.T
+    return flags, np.moveaxis(mask, -1, axis)
+
+
+@pl.api.register_expr_namespace("pyutils")
+class PyutilsExprNamespace:
+    """
+    Polars expression namespace, registered when pyutils is imported, to run the detections inside (lazy) queries.
+    This is a Python UDF bridge through map_batches, not a native polars expression: every batch, or every group in a
+    `group_by(...).agg` or `over(...)` context, is converted with `Series.to_numpy()`, which copies when the series has
+    nulls or is not contiguous, and the detection runs in Python while holding the GIL, one group at a time.
+    Example:
+        lf.with_columns(pl.col("value").pyutils.interpolation_mask(sequence_length=5).over("meter_id"))
+    """
+
+    def __init__(self, expr: pl.Expr):
+        self._expr = expr
+
+    def interpolation_mask(self, sequence_length: int = 5, tolerance=1e-5) -> pl.Expr:
+        """Boolean expression, True for the values that are part of an interpolated segment. Nulls break segments."""
+        if sequence_length <= 2:
+            raise ValueError('sequence_length must be greater than 2')
+
+        def mask(series: pl.Series) -> pl.Series:
+            _, values = detect_vector_interpolation(series.to_numpy(), sequence_length, tolerance, output="bool")
+            return pl.Series(series.name, values, dtype=pl.Boolean)
 
-        if abs(current_step - previous_step) < tolerance:
-            # if the step is the same as the previous step within tolerance, we are potentially in linear interpollation
-            current_sequence_length += 1
-
-            # if the last value of the vector is still part of a sequence, we need to wrap it up here
-            if i == len(vector) - 1:
-                if current_sequence_length >= sequence_length:
-                    has_interpolated_segment = True
-                    mask[i - current_sequence_length + 1 : i + 1] = 1
-        else:
-            # if the step is different, wrap up the previous sequence
-            if current_sequence_length >= sequence_length:
-                has_interpolated_segment = True
-                mask[i - current_sequence_length : i] = 1
-
-            # start a new sequence
-            current_sequence_length = 2  # reset to 2 because we have a new step
-            previous_step = current_step
-
-    return has_interpolated_segment, mask
\ No newline at end of file
+        return self._expr.map_batches(mask, return_dtype=pl.Boolean)
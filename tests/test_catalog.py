@@ -0,0 +1,41 @@
+import os
+from datetime import date
+from pyutils.catalog import DatedFileCatalog
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w"):
+        pass
+
+
+def test_catalog_range_and_latest(tmp_path):
+    for name in ["export_2024-01-01.csv", "export_2024-01-15.csv", "export_2024-02-01.csv", "readme.txt"]:
+        _touch(str(tmp_path / name))
+    _touch(str(tmp_path / "sub" / "export_2024-01-20.csv"))
+    catalog = DatedFileCatalog(str(tmp_path))
+    assert len(catalog) == 4
+    in_january = catalog.between("2024-01-01", date(2024, 1, 31))
+    assert [os.path.basename(p) for p in in_january] == [
+        "export_2024-01-01.csv", "export_2024-01-15.csv", "export_2024-01-20.csv"]
+    assert [os.path.basename(p) for p in catalog.latest(2)] == ["export_2024-02-01.csv", "export_2024-01-20.csv"]
+
+
+def test_catalog_refresh_picks_up_changes(tmp_path):
+    _touch(str(tmp_path / "a" / "export_2024-01-01.csv"))
+    _touch(str(tmp_path / "b" / "export_2024-01-02.csv"))
+    catalog = DatedFileCatalog(str(tmp_path))
+    assert len(catalog) == 2
+
+    _touch(str(tmp_path / "a" / "export_2024-03-01.csv"))
+    os.remove(str(tmp_path / "b" / "export_2024-01-02.csv"))
+    os.rmdir(str(tmp_path / "b"))
+    catalog.refresh()
+    assert [os.path.basename(p) for p in catalog.latest(5)] == ["export_2024-03-01.csv", "export_2024-01-01.csv"]
+
+
+def test_catalog_skips_invalid_dates(tmp_path):
+    _touch(str(tmp_path / "export_2024-13-45.csv"))
+    catalog = DatedFileCatalog(str(tmp_path))
+    assert len(catalog) == 0
+    assert catalog.latest() == []
@@ -1,4 +1,6 @@
 import pytest
+import numpy as np
+import polars as pl
 from datetime import date, timezone
 from pyutils.clock import parse_iso_date
 from pyutils import clock
@@ -61,3 +63,55 @@ def test_parse_iso_date_non_numeric():
 def test_parse_iso_date_none():
     with pytest.raises(TypeError):
         parse_iso_date(None)
+
+def test_parse_iso_dates_list():
+    dates, invalid = clock.parse_iso_dates(["2024-06-15", "2024-6-5", "2024-01- 5", None, "2024/06/15", "2024-02-30",
+                                            "0000-01-01"])
+    assert dates.dtype == np.dtype("datetime64[D]")
+    assert dates[0] == np.datetime64("2024-06-15")
+    assert dates[1] == np.datetime64("2024-06-05")
+    assert dates[2] == np.datetime64("2024-01-05") == np.datetime64(clock.parse_iso_date("2024-01- 5"))
+    assert np.isnat(dates[3:]).all()
+    assert invalid.tolist() == [False, False, False, False, True, True, True]
+    with pytest.raises(ValueError):
+        clock.parse_iso_date("0000-01-01")
+
+def test_parse_iso_dates_matches_parse_iso_date():
+    candidates = ["2024-01-05", "2024-1-5", "2024-01- 5", "2024- 1-05", " 2024-01-05", "2024-01-05 ", "0000-01-01",
+                  "0001-01-01", "9999-12-31", "2024-13-01", "2024-00-10", "2024-02-29", "2023-02-29", "2024-1-32"]
+    _, invalid = clock.parse_iso_dates(candidates)
+    for date_str, is_invalid in zip(candidates, invalid):
+        try:
+            clock.parse_iso_date(date_str)
+            assert not is_invalid, date_str
+        except ValueError:
+            assert is_invalid, date_str
+
+def test_parse_iso_dates_series():
+    dates, invalid = clock.parse_iso_dates(pl.Series("d", ["1999-12-31", "June 15, 2024"]))
+    assert dates.dtype == pl.Date
+    assert dates.to_list() == [date(1999, 12, 31), None]
+    assert invalid.to_list() == [False, True]
+
+def test_parse_iso_dates_raise_collects_all_errors():
+    with pytest.raises(ValueError, match="abcd-ef-gh.*2024-xx-15"):
+        clock.parse_iso_dates(np.array(["2024-01-01", "abcd-ef-gh", "2024-xx-15"]), errors="raise")
+
+def test_coarse_clock_caches_per_tick(monkeypatch):
+    now = [1_700_000_000.2]
+    monkeypatch.setattr(clock.time, "time", lambda: now[0])
+    coarse_clock = clock.CoarseClock(tz=timezone.utc)
+    date_str, time_str = coarse_clock.get_date_and_time_str("%Y-%m-%d", "%H:%M:%S")
+    assert (date_str, time_str) == ("2023-11-14", "22:13:20")
+    now[0] += 0.5
+    assert coarse_clock.get_time_str("%H:%M:%S") is time_str
+    now[0] += 1
+    assert coarse_clock.get_time_str("%H:%M:%S") == "22:13:21"
+    assert coarse_clock.get_date_str("%Y-%m-%d") is date_str
+
+def test_coarse_clock_resolution(monkeypatch):
+    monkeypatch.setattr(clock.time, "time", lambda: 1_700_000_059.0)
+    coarse_clock = clock.CoarseClock(tz=timezone.utc, resolution=60)
+    assert coarse_clock.get_time_str("%H:%M:%S") == "22:14:00"
+    with pytest.raises(ValueError):
+        clock.CoarseClock(resolution=0)
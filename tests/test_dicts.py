@@ -1,5 +1,5 @@
 import pytest
-from pyutils.dicts import merge_dicts, has_empty_leaves
+from pyutils.dicts import merge_dicts, merged_dicts, diff_dicts, apply_dict_patch, has_empty_leaves, LeafIndex, LayeredDict, dict_fingerprint, memoize_dicts
 
 def test_merge_dicts():
     dict1 = {"a": 1, "b": {"c": 2}}
@@ -12,4 +12,177 @@ def test_has_empty_leaves():
     dict_with_empty = {"a": 1, "b": {"c": None}}
     dict_without_empty = {"a": 1, "b": {"c": 2}}
     assert has_empty_leaves(dict_with_empty) is True
-    assert has_empty_leaves(dict_without_empty) is False
\ No newline at end of file
+    assert has_empty_leaves(dict_without_empty) is False
+
+def _deep_dict(depth, leaf):
+    root = node = {}
+    for _ in range(depth - 1):
+        node["child"] = {}
+        node = node["child"]
+    node["child"] = leaf
+    return root
+
+def _deepest_leaf(d):
+    while "child" in d:
+        d = d["child"]
+    return d
+
+def _deepest(d):
+    while isinstance(d, dict):
+        d = d["child"]
+    return d
+
+def test_merge_dicts_deep_tree():
+    depth = 5000
+    deep = _deep_dict(depth, {"base": 1})
+    merge_dicts(deep, _deep_dict(depth, {"override": 2}))
+    leaf = deep
+    for _ in range(depth):
+        leaf = leaf["child"]
+    assert leaf == {"base": 1, "override": 2}
+
+def test_merged_dicts_deep_tree():
+    depth = 5000
+    deep = _deep_dict(depth, 1)
+    result = merged_dicts(deep, _deep_dict(depth, 2))
+    assert _deepest(result) == 2
+    assert _deepest(deep) == 1
+
+def test_merged_dicts_does_not_mutate_and_shares_untouched_branches():
+    base = {"a": 1, "b": {"c": 2, "x": {"y": 1}}, "untouched": {"big": [1, 2, 3]}}
+    override = {"b": {"d": 3}, "e": 4}
+    result = merged_dicts(base, override)
+    assert result == {"a": 1, "b": {"c": 2, "d": 3, "x": {"y": 1}}, "untouched": {"big": [1, 2, 3]}, "e": 4}
+    assert base == {"a": 1, "b": {"c": 2, "x": {"y": 1}}, "untouched": {"big": [1, 2, 3]}}
+    assert result["untouched"] is base["untouched"]
+    assert result["b"]["x"] is base["b"]["x"]
+    assert result["b"] is not base["b"]
+
+def test_layered_dict_resolves_like_merge_dicts():
+    defaults = {"db": {"host": "localhost", "port": 5432}, "debug": False, "paths": "none"}
+    site = {"db": {"host": "db.local"}, "paths": {"data": "/data"}}
+    cli = {"db": {"port": 6543}, "debug": True}
+    layered = LayeredDict(defaults, site, cli)
+    assert layered["db"]["host"] == "db.local"
+    assert layered["db"]["port"] == 6543
+    assert layered["debug"] is True
+    assert dict(layered["paths"]) == {"data": "/data"}
+    assert list(layered) == ["db", "debug", "paths"]
+    assert layered.to_dict() == {"db": {"host": "db.local", "port": 6543}, "debug": True, "paths": {"data": "/data"}}
+    assert "missing" not in layered
+    with pytest.raises(KeyError):
+        layered["db"]["user"]
+
+def test_layered_dict_update_layer_invalidates_touched_paths_only():
+    layered = LayeredDict({"a": {"b": 1, "c": {"d": 2}}, "f": {"g": 1}}, {"a": {"b": 10}})
+    assert layered["a"]["b"] == 10
+    assert layered["a"]["c"]["d"] == 2
+    assert layered["f"]["g"] == 1
+    cache = layered._state.cache
+    untouched = cache[("f",)]
+    layered.update_layer(1, {"a": {"b": 11, "c": 5}})
+    assert ("a", "c", "d") not in cache
+    assert cache[("f",)] is untouched
+    assert layered["a"]["b"] == 11
+    assert layered["a"]["c"] == 5
+    layered.update_layer(0, {"a": {"e": 3}})
+    assert layered["a"]["e"] == 3
+    layered.set_layer(1, {})
+    assert layered.to_dict() == {"a": {"b": 1, "c": {"d": 2}, "e": 3}, "f": {"g": 1}}
+
+def test_leaf_index_lookup_and_empty_tracking():
+    config = {"db": {"host": "", "port": 5432}, "name": "app", "paths": {}}
+    index = LeafIndex(config)
+    assert index["db.port"] == 5432
+    assert len(index) == 3
+    assert index.empty_paths == ["db.host"]
+    with pytest.raises(ValueError, match="db.host"):
+        index.validate()
+    index.set("db.host", "localhost")
+    assert not index.has_empty_leaves()
+    assert config["db"]["host"] == "localhost"
+    index.update({"db": {"user": None}, "name": {"short": "a"}})
+    assert index.empty_paths == ["db.user"]
+    assert "name" not in index and index["name.short"] == "a"
+    index.delete("db")
+    assert not index.has_empty_leaves()
+    assert sorted(index) == ["name.short"]
+    assert config == {"name": {"short": "a"}, "paths": {}}
+
+def test_diff_dicts_and_apply_patch():
+    shared = {"big": list(range(10))}
+    old = {"a": 1, "b": {"c": 2, "d": 3}, "shared": shared, "gone": 0, "leaf": {"x": 1}}
+    new = {"a": 1, "b": {"c": 20, "d": 3, "e": 4}, "shared": shared, "leaf": 5, "new": {"y": 1}}
+    patch = diff_dicts(old, new)
+    assert patch == {
+        "added": {("b", "e"): 4, ("new",): {"y": 1}},
+        "removed": [("gone",)],
+        "changed": {("b", "c"): 20, ("leaf",): 5},
+    }
+    assert apply_dict_patch(old, patch) == new
+    assert diff_dicts(new, dict(new)) == {"added": {}, "removed": [], "changed": {}}
+
+def test_dict_fingerprint_is_order_independent_and_typed():
+    assert dict_fingerprint({"a": 1, "b": [1, {"c": 2}]}) == dict_fingerprint({"b": [1, {"c": 2}], "a": 1})
+    assert dict_fingerprint({"a": [1, 2]}) != dict_fingerprint({"a": (1, 2)})
+    assert dict_fingerprint({"a": {}}) != dict_fingerprint({"a": []})
+    assert dict_fingerprint([1, 2]) != dict_fingerprint([2, 1])
+    with pytest.raises(TypeError):
+        dict_fingerprint({"a": bytearray(b"x")})
+
+def test_diff_dicts_deep_tree():
+    depth = 5000
+    old, new = _deep_dict(depth, {"same": 1, "changed": 1}), _deep_dict(depth, {"same": 1, "changed": 2})
+    patch = diff_dicts(old, new)
+    path = ("child",) * depth
+    assert patch == {"added": {}, "removed": [], "changed": {path + ("changed",): 2}}
+    assert diff_dicts(old, _deep_dict(depth, {"same": 1, "changed": 1})) == {"added": {}, "removed": [], "changed": {}}
+    apply_dict_patch(old, patch)
+    assert _deepest_leaf(old) == {"same": 1, "changed": 2}
+
+def test_memoize_dicts_deep_tree():
+    calls = []
+
+    @memoize_dicts()
+    def deepest(config):
+        calls.append(config)
+        return _deepest(config)
+
+    assert deepest(_deep_dict(5000, 1)) == 1
+    assert deepest(_deep_dict(5000, 1)) == 1
+    assert deepest(_deep_dict(5000, 2)) == 2
+    assert len(calls) == 2
+
+def test_memoize_dicts_lru_and_stats():
+    calls = []
+
+    @memoize_dicts(maxsize=2)
+    def total(config, scale=1):
+        calls.append(config)
+        return sum(config["values"]) * scale
+
+    assert total({"values": [1, 2]}) == 3
+    assert total({"values": [1, 2]}) == 3
+    assert total({"values": [1, 2]}, scale=2) == 6
+    assert total({"values": [3]}) == 3
+    assert total({"values": [1, 2]}) == 3
+    assert len(calls) == 4
+    assert total.cache_info() == {"hits": 1, "misses": 4, "evictions": 2, "expirations": 0, "maxsize": 2, "currsize": 2}
+    total.cache_clear()
+    assert total.cache_info()["currsize"] == 0
+
+def test_memoize_dicts_ttl(monkeypatch):
+    from pyutils import dicts
+    now = [100.0]
+    monkeypatch.setattr(dicts.time, "monotonic", lambda: now[0])
+
+    @memoize_dicts(ttl=10, assume_immutable=True)
+    def identity(config):
+        return dict(config)
+
+    config = {"a": 1}
+    first = identity(config)
+    assert identity(config) is first
+    now[0] += 11
+    assert identity(config) is not first
+    assert identity.cache_info()["expirations"] == 1
@@ -0,0 +1,262 @@
+import logging
+import queue
+
+import pytest
+from pyutils import logger
+from pyutils.logger import get_logger, setup_root_logger
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield root
+    logger._stop_queue_listener()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_queue_logging_writes_file_after_stop(restore_root_logger, tmp_path):
+    setup_root_logger(with_logfile=True, log_folder_path=str(tmp_path), timestamp_log_file=False, use_queue=True)
+    assert [type(handler) for handler in restore_root_logger.handlers] == [logger._BoundedQueueHandler]
+    args = ["before"]
+    get_logger("queued").info("value %s", args)
+    args[0] = "after"
+    logger._stop_queue_listener()
+    content = (tmp_path / "app.log").read_text()
+    assert "queued-INFO: value ['before']" in content
+    assert not restore_root_logger.handlers
+
+
+@pytest.mark.parametrize("policy, kept", [("drop_new", ["0", "1"]), ("drop_oldest", ["2", "3"])])
+def test_queue_policies_drop_records(policy, kept):
+    handler = logger._BoundedQueueHandler(queue.Queue(2), policy)
+    for i in range(4):
+        handler.emit(logging.LogRecord("test", logging.INFO, __file__, 0, str(i), None, None))
+    assert [handler.queue.get_nowait().msg for _ in range(2)] == kept
+    assert handler.dropped == 2
+
+
+def test_unknown_queue_policy():
+    with pytest.raises(ValueError):
+        setup_root_logger(use_queue=True, queue_policy="spill")
+
+
+def test_indent_multiline_formatter():
+    formatter = logger.IndentMultilineFormatter("%(asctime)s-%(name)s-%(levelname)s: %(message)s",
+                                                datefmt="%Y-%m-%dT%H:%M:%S")
+    record = logging.LogRecord("app", logging.INFO, __file__, 0, "first\nsecond", None, None)
+    first, second = formatter.format(record).split("\n")
+    prefix = first[:-len("first")]
+    assert prefix.endswith("-app-INFO: ")
+    assert second == " " * len(prefix) + "second"
+    record = logging.LogRecord("app", logging.INFO, __file__, 0, "single", None, None)
+    assert formatter.format(record) == prefix + "single"
+
+
+def test_get_logger_defaults_to_caller_file_name():
+    assert get_logger().name == "test_logger.py"
+
+
+def test_json_lines_handler_buffers_rotates_and_compresses(tmp_path):
+    import gzip
+    import json
+    path = tmp_path / "app.jsonl"
+    handler = logger.JsonLinesFileHandler(str(path), buffer_bytes=10_000, flush_seconds=60, rotate_bytes=1000)
+    log = logging.getLogger("jsonl-test")
+    log.addHandler(handler)
+    log.propagate = False
+    try:
+        log.warning("buffered %d", 1)
+        assert path.read_text() == ""
+        log.error("flushed at error level")
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [(line["level"], line["message"]) for line in lines] == [("WARNING", "buffered 1"),
+                                                                         ("ERROR", "flushed at error level")]
+        for i in range(20):
+            log.error("record %d %s", i, "x" * 100)
+    finally:
+        log.removeHandler(handler)
+        handler.close()
+    rotated = sorted(tmp_path.glob("app.jsonl.*"))
+    assert rotated and all(file.suffix == ".gz" for file in rotated)
+    messages = [json.loads(line)["message"] for file in rotated for line in gzip.open(file, "rt")]
+    messages += [json.loads(line)["message"] for line in path.read_text().splitlines()]
+    assert len(messages) == 22
+    assert path.stat().st_size <= 1000
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_rate_limit_filter_per_call_site(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(logger.time, "monotonic", lambda: now[0])
+    handler = _ListHandler()
+    other_handler = _ListHandler()
+    rate_limit_filter = logger.RateLimitFilter(rate=1, burst=2, summary_seconds=5)
+    handler.addFilter(rate_limit_filter)
+    other_handler.addFilter(rate_limit_filter)
+    log = logging.getLogger("rate-limit-test")
+    log.addHandler(handler)
+    log.addHandler(other_handler)
+    log.propagate = False
+    def warn(*args):
+        # a single call site
+        log.warning(*args)
+
+    try:
+        for i in range(10):
+            warn("value %d", i)
+        assert handler.messages == other_handler.messages == ["value 0", "value 1"]
+        now[0] = 2.0
+        for _ in range(10):
+            warn("same")
+        assert handler.messages[-1] == "same"
+        now[0] = 6.0
+        warn("same")
+        assert handler.messages[-1] == "same"
+        now[0] = 8.0
+        warn("same")
+        assert handler.messages[-1] == "same (suppressed 18 similar messages)"
+        warn("value %d", 99)
+        assert handler.messages[-1] == "value 99"
+        warn("again")
+        rate_limit_filter.flush_summaries([handler])
+        assert handler.messages[-1] == "Suppressed 1 similar messages"
+        # repeats are collapsed from the last one let through, also after the call site was quiet
+        now[0] = 100.0
+        for _ in range(5):
+            warn("burst")
+        assert handler.messages[-2:] == ["Suppressed 1 similar messages", "burst"]
+        log.warning("other call site")
+        assert handler.messages[-1] == "other call site"
+    finally:
+        log.removeHandler(handler)
+        log.removeHandler(other_handler)
+
+
+def test_rate_limit_filter_with_array_arguments():
+    import numpy as np
+    handler = _ListHandler()
+    handler.addFilter(logger.RateLimitFilter(rate=1000, burst=1000))
+    log = logging.getLogger("rate-limit-array-test")
+    log.addHandler(handler)
+    log.propagate = False
+    try:
+        for i in range(3):
+            log.warning("values %s", np.array([i, i + 1]))
+        log.warning(np.array([1, 2]))
+        log.warning(np.array([1, 2]))
+    finally:
+        log.removeHandler(handler)
+    assert handler.messages == ["values [0 1]", "values [1 2]", "values [2 3]", "[1 2]", "[1 2]"]
+
+
+def test_rate_limit_with_queue_does_not_block(restore_root_logger, monkeypatch, capsys):
+    import threading
+    now = [0.0]
+    monkeypatch.setattr(logger.time, "monotonic", lambda: now[0])
+    setup_root_logger(use_queue=True, queue_size=1, rate_limit=1)
+    log = get_logger("rate-limit-queue-test")
+
+    def warn(*args):
+        # a single call site
+        log.warning(*args)
+
+    def produce():
+        for i in range(50):
+            warn("message %d", i)
+
+    threads = [threading.Thread(target=produce) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert not any(thread.is_alive() for thread in threads)
+    # the listener must have judged every queued record before the clock moves
+    logger._queue_listener.queue.join()
+    now[0] = 100.0
+    warn("after")
+    logger._stop_queue_listener()
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 21
+    assert lines[-1].endswith("after (suppressed 380 similar messages)\033[0m")
+
+
+@pytest.mark.parametrize("use_queue", [False, True])
+def test_rate_limit_pending_counts_reported_at_shutdown(restore_root_logger, monkeypatch, capsys, use_queue):
+    monkeypatch.setattr(logger.time, "monotonic", lambda: 0.0)
+    setup_root_logger(use_queue=use_queue, rate_limit=1)
+    log = get_logger("rate-limit-shutdown-test")
+    for i in range(30):
+        log.warning("message %d", i)
+    # what the atexit hooks do, in their order
+    logger._stop_queue_listener()
+    logger._flush_rate_limit_summaries()
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 21
+    assert lines[-1].endswith("-rate-limit-shutdown-test-WARNING: Suppressed 10 similar messages\033[0m")
+
+
+def _log_from_worker(i):
+    import os
+    logging.getLogger("worker").warning("from worker %d", i)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logging.getLogger("worker").exception("failed %d", i)
+    return os.getpid()
+
+
+@pytest.mark.parametrize("start_method", ["fork", "spawn"])
+def test_multiprocess_logging_through_parent(restore_root_logger, tmp_path, start_method):
+    import multiprocessing
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    setup_root_logger(with_logfile=True, log_folder_path=str(tmp_path), timestamp_log_file=False, multiprocess=True,
+                      multiprocess_start_method=start_method)
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context(start_method),
+                             initializer=logger.setup_worker_logger,
+                             initargs=logger.worker_logger_initargs()) as pool:
+        pids = set(pool.map(_log_from_worker, range(4)))
+    assert os.getpid() not in pids
+    logger._stop_worker_listener()
+    content = (tmp_path / "app.log").read_text()
+    for i in range(4):
+        assert f"worker-WARNING: from worker {i}" in content
+        assert f"worker-ERROR: failed {i}" in content
+    assert content.count("ValueError: boom") == 4
+
+
+def test_json_lines_handler_closes_while_lock_is_held(tmp_path):
+    import json
+    import threading
+    import time
+    path = tmp_path / "app.jsonl"
+    handler = logger.JsonLinesFileHandler(str(path), flush_seconds=0.05)
+    handler.handle(logging.LogRecord("jsonl-close-test", logging.INFO, __file__, 0, "buffered", None, None))
+
+    def shutdown():
+        # like logging.shutdown: flush and close while holding the handler lock
+        with handler.lock:
+            # give the worker time to find the old buffer and wait for the lock
+            time.sleep(0.3)
+            handler.flush()
+            handler.close()
+
+    closing = threading.Thread(target=shutdown)
+    closing.start()
+    closing.join(timeout=5)
+    assert not closing.is_alive()
+    assert [json.loads(line)["message"] for line in path.read_text().splitlines()] == ["buffered"]
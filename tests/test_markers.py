@@ -9,6 +9,7 @@ def test_title_default(monkeypatch):
     assert isinstance(result, str)
     assert '===' in result
     assert result.count('\n') == 2
+    assert "test_markers.py" in result
 
 
 def test_title_custom(monkeypatch):
@@ -1,7 +1,12 @@
 import pytest
+import numpy as np
 import polars as pl
 from datetime import datetime, timezone
-from pyutils.clock import make_naive_df_timezone_aware
+from pyutils.clock import (
+    make_naive_df_timezone_aware,
+    localize_naive_datetime64,
+    convert_utc_datetime64_to_local,
+)
 
 # 1. Simple consecutive dates
 def test_simple_consecutive_dates():
@@ -100,3 +105,104 @@ def test_ambiguous_dates_dst_fallback():
     # All UTC values should be monotonic
     assert all(earlier <= later for earlier, later in zip(utc_vals, utc_vals[1:]))
 
+# 10. Result matches the per-element python implementation, including nulls, folds and out-of-order data
+def test_matches_localize_naive_datetimes():
+    from datetime import timedelta
+    from pyutils.clock import localize_naive_datetimes, convert_local_datetimes_to_utc
+    start = datetime(2023, 10, 28, 22, 0)
+    naive_datetimes = [start + timedelta(minutes=15 * i) for i in range(40)]
+    naive_datetimes[3] = None
+    naive_datetimes.insert(10, datetime(2023, 10, 28, 20, 0))
+    df = pl.DataFrame({"datetime_naive": naive_datetimes})
+    df_aware = make_naive_df_timezone_aware(df, tz="Europe/Brussels")
+    expected = convert_local_datetimes_to_utc(localize_naive_datetimes(naive_datetimes, "Europe/Brussels"))
+    assert df_aware["datetime_utc"].to_list() == expected
+
+# 11. Non-existent times (CET -> CEST transition) resolve like datetime.replace(fold=0)
+def test_nonexistent_dates_dst_spring_forward():
+    naive_datetimes = [datetime(2023, 3, 26, 1, 30), datetime(2023, 3, 26, 2, 30)]
+    df = pl.DataFrame({"datetime_naive": naive_datetimes})
+    df_aware = make_naive_df_timezone_aware(df, tz="Europe/Brussels")
+    assert df_aware["datetime_utc"].to_list() == [
+        datetime(2023, 3, 26, 0, 30, tzinfo=timezone.utc),
+        datetime(2023, 3, 26, 1, 30, tzinfo=timezone.utc),
+    ]
+
+# 12. The time unit of the naive column is kept
+def test_time_unit_is_kept():
+    df = pl.DataFrame({"datetime_naive": pl.Series([datetime(2023, 1, 1, 12, 0)], dtype=pl.Datetime("ns"))})
+    df_aware = make_naive_df_timezone_aware(df)
+    assert df_aware.schema["datetime_utc"] == pl.Datetime("ns", "UTC")
+    assert df_aware.schema["datetime_local"] == pl.Datetime("ns", "Europe/Brussels")
+
+# 13. datetime64 localization matches the per-element python implementation
+def test_localize_naive_datetime64_matches_list_version():
+    from pyutils.clock import localize_naive_datetimes, convert_local_datetimes_to_utc
+    naive_datetimes = [
+        datetime(2023, 10, 29, 1, 30),
+        None,
+        datetime(2023, 10, 29, 2, 30),
+        datetime(2023, 10, 29, 2, 30),
+        datetime(2023, 3, 26, 2, 30),
+        datetime(2023, 7, 1, 12, 0),
+    ]
+    expected = convert_local_datetimes_to_utc(localize_naive_datetimes(naive_datetimes, "Europe/Brussels"))
+    naive = np.array([np.datetime64(dt, "us") if dt else np.datetime64("NaT", "us") for dt in naive_datetimes])
+    utc = localize_naive_datetime64(naive, "Europe/Brussels")
+    assert utc.dtype == np.dtype("datetime64[us]")
+    assert [dt.replace(tzinfo=None) if dt else None for dt in expected] == utc.tolist()
+
+# 14. int64 epochs with an explicit missing mask, and conversion back to local wall time
+def test_datetime64_epochs_with_mask_roundtrip():
+    naive = np.array([
+        np.datetime64("2023-10-29T02:30", "s"),
+        np.datetime64("2023-10-29T02:30", "s"),
+        np.datetime64("2023-10-29T03:30", "s"),
+    ]).view(np.int64)
+    mask = np.array([False, False, True])
+    utc = localize_naive_datetime64(naive, "Europe/Brussels", mask=mask, unit="s")
+    assert utc.dtype == np.int64
+    assert utc[1] - utc[0] == 3600
+    assert utc[2] == np.iinfo(np.int64).min
+    local = convert_utc_datetime64_to_local(utc, "Europe/Brussels", unit="s")
+    assert np.array_equal(local[:2], naive[:2])
+    assert local[2] == np.iinfo(np.int64).min
+
+# 15. LazyFrames are supported and streaming batches carry the fold state across batch boundaries
+def test_lazyframe_and_streaming_batches_match_eager():
+    from datetime import timedelta
+    from pyutils.clock import iter_naive_lf_timezone_aware
+    start = datetime(2023, 10, 29, 1, 0)
+    naive_datetimes = [start + timedelta(minutes=15 * i) for i in range(12)]
+    # repeat the ambiguous hour right at a batch boundary, preceded by a null
+    naive_datetimes = naive_datetimes[:8] + [None] + naive_datetimes[4:]
+    df = pl.DataFrame({"datetime_naive": naive_datetimes, "value": range(len(naive_datetimes))})
+    expected = make_naive_df_timezone_aware(df)
+    assert make_naive_df_timezone_aware(df.lazy()).collect().equals(expected)
+    batches = list(iter_naive_lf_timezone_aware(df.lazy(), chunk_size=9))
+    assert len(batches) > 1
+    assert pl.concat(batches).equals(expected)
+
+# 16. Stacked series: the fold state is reset per group and the row order is kept
+def test_grouped_series_keep_order():
+    from pyutils.clock import iter_naive_lf_timezone_aware
+    naive_datetimes = [
+        datetime(2023, 10, 29, 2, 30),
+        datetime(2023, 10, 29, 2, 30),
+        datetime(2023, 10, 29, 2, 30),
+        datetime(2023, 10, 29, 2, 30),
+    ]
+    df = pl.DataFrame({"meter": ["a", "b", "a", "b"], "datetime_naive": naive_datetimes})
+    df_aware = make_naive_df_timezone_aware(df, by="meter")
+    assert df_aware["meter"].to_list() == ["a", "b", "a", "b"]
+    utc = df_aware["datetime_utc"].to_list()
+    # the first occurrence within each meter is the earliest (CEST) one
+    assert utc[0] == utc[1] < utc[2] == utc[3]
+    batches = list(iter_naive_lf_timezone_aware(df.lazy(), by="meter", chunk_size=1))
+    assert pl.concat(batches).equals(df_aware)
+
+# 17. Edge case: missing group column
+def test_missing_group_column_raises():
+    df = pl.DataFrame({"datetime_naive": [datetime(2023, 1, 1, 12, 0)]})
+    with pytest.raises(ValueError):
+        make_naive_df_timezone_aware(df, by="meter")
@@ -0,0 +1,81 @@
+import logging
+import random
+
+import pytest
+from pyutils import timing
+from pyutils.timing import LatencyHistogram, Timer, timed, configure_timing, get_histogram, report_timings
+
+
+@pytest.fixture(autouse=True)
+def restore_timing():
+    yield
+    configure_timing()
+    timing.reset_timings()
+
+
+def test_bucket_bounds_contain_durations():
+    for ns in [0, 1, 31, 32, 33, 1000, 123456789] + [random.randrange(1 << 43) for _ in range(1000)]:
+        low, high = timing._bucket_bounds(timing._bucket_index(ns))
+        assert low <= ns <= high
+        assert high - low <= max(1, low) / 16
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram("test")
+    for ms in range(1, 101):
+        histogram.record_ns(ms * 1_000_000)
+    summary = histogram.summary()
+    assert summary["count"] == 100
+    assert summary["mean"] == pytest.approx(0.0505)
+    assert summary["p50"] == pytest.approx(0.050, rel=0.07)
+    assert summary["p99"] == pytest.approx(0.099, rel=0.07)
+    assert summary["max"] == 0.1
+    histogram.summary(reset=True)
+    assert histogram.summary()["count"] == 0
+
+
+def test_timed_timer_and_report(caplog):
+    @timed("work")
+    def work():
+        return 1
+
+    assert work() == 1
+    with Timer("block"):
+        pass
+    timer = Timer("block").start()
+    assert timer.stop() >= 0
+    with caplog.at_level(logging.INFO, logger="pyutils.timing"):
+        summaries = report_timings()
+    assert summaries["work"]["count"] == 1
+    assert summaries["block"]["count"] == 2
+    assert any(message.startswith("block: n=2 ") for message in caplog.messages)
+
+
+def test_disabled_timing_records_nothing():
+    configure_timing(enabled=False)
+
+    @timed("disabled")
+    def work():
+        return 1
+
+    work()
+    with Timer("disabled") as timer:
+        pass
+    assert timer.stop() is None
+    assert get_histogram("disabled").count == 0
+
+
+def test_interval_report(monkeypatch, caplog):
+    now = [0]
+    monkeypatch.setattr(timing.time, "perf_counter_ns", lambda: now[0])
+    configure_timing(report_interval=10)
+    with caplog.at_level(logging.INFO, logger="pyutils.timing"):
+        with Timer("interval"):
+            now[0] += 1_000_000_000
+        assert not caplog.messages
+        with Timer("interval"):
+            now[0] += 10_000_000_000
+        assert len(caplog.messages) == 1
+        assert caplog.messages[0].startswith("interval: n=2 mean=5.500s p50=")
+        assert caplog.messages[0].endswith(" max=10.000s")
+    assert get_histogram("interval").count == 0
@@ -58,3 +58,112 @@ def test_two_element_vector():
     has_segment, mask = detect_vector_interpolation(v, 3)
     assert has_segment is False
     assert np.all(mask == 0)
+
+
+def test_steps_are_compared_to_first_step_of_segment():
+    # consecutive steps differ by 0.6, but the steps drift away from the first step of the segment
+    v = np.array([0, 1, 2.6, 4.8, 7.6])
+    has_segment, mask = detect_vector_interpolation(v, 4, tolerance=1)
+    assert has_segment is False
+    assert np.all(mask == 0)
+
+
+def test_nan_breaks_segments():
+    v = np.array([1, 2, 3, 4, np.nan, 6, 7, 8, 9])
+    has_segment, mask = detect_vector_interpolation(v, 4)
+    expected_mask = np.array([1, 1, 1, 1, 0, 1, 1, 1, 1])
+    assert has_segment is True
+    assert np.array_equal(mask, expected_mask)
+
+
+def test_batch_matches_single_vector():
+    from pyutils.vectors import detect_vector_interpolation_batch
+    data = np.array([
+        [1, 9, 1, 2, 3, 4, 5, 1, 9],
+        [1, 9, 1, 2, 1, 4, 5, 1, 9],
+        [5, 5, 5, 9, 1, 2, 3, 0, 5],
+    ], dtype=float)
+    flags, mask = detect_vector_interpolation_batch(data, 3, chunk_size=2)
+    assert flags.tolist() == [True, False, True]
+    for row, row_mask in zip(data, mask):
+        assert np.array_equal(row_mask, detect_vector_interpolation(row, 3)[1].astype(bool))
+    flags_t, mask_t = detect_vector_interpolation_batch(data.T, 3, axis=0)
+    assert np.array_equal(flags_t, flags)
+    assert np.array_equal(mask_t, mask.T)
+
+
+def test_batch_polars_dataframe():
+    import polars as pl
+    from pyutils.vectors import detect_vector_interpolation_batch
+    df = pl.DataFrame({"a": [1.0, 2.0, 3.0, 4.0, 9.0], "b": [1.0, 9.0, 1.0, 9.0, 1.0]})
+    flags, mask = detect_vector_interpolation_batch(df, 3)
+    assert flags.tolist() == [True, False]
+    assert mask.shape == (5, 2)
+    assert mask[:, 0].tolist() == [True, True, True, True, False]
+    assert not mask[:, 1].any()
+
+
+def test_output_formats():
+    v = np.array([5, 5, 5, 9, 1, 2, 3, 4, 5, 0, 5, 5, 5])
+    expected_mask = np.array([1, 1, 1, 0, 1, 1, 1, 1, 1, 0, 1, 1, 1])
+    _, segments = detect_vector_interpolation(v, 3, output="segments")
+    assert segments["start"].tolist() == [0, 4, 10]
+    assert segments["end"].tolist() == [3, 9, 13]
+    assert segments["step"].tolist() == [0, 1, 0]
+    _, mask = detect_vector_interpolation(v, 3, output="bool")
+    assert np.array_equal(mask, expected_mask.astype(bool))
+    _, packed = detect_vector_interpolation(v, 3, output="packed")
+    assert np.array_equal(np.unpackbits(packed, count=len(v)), expected_mask)
+    with pytest.raises(ValueError):
+        detect_vector_interpolation(v, 3, output="list")
+
+
+def test_chunked_reports_segments_spanning_chunks_once(tmp_path):
+    from pyutils.vectors import detect_vector_interpolation_chunked
+    v = np.array([5, 5, 5, 9, 1, 2, 3, 4, 5, 0, 5, 5, 5], dtype=float)
+    memmap = np.memmap(tmp_path / "vector.dat", dtype=float, mode="w+", shape=v.shape)
+    memmap[:] = v
+    has_segment, segments = detect_vector_interpolation_chunked(memmap, 3, chunk_size=2)
+    assert has_segment is True
+    assert np.array_equal(segments, detect_vector_interpolation(v, 3, output="segments")[1])
+
+
+def test_online_detector_matches_batch():
+    from pyutils.vectors import InterpolationDetector
+    v = np.array([5, 5, 5, 9, 1, 2, 3, 4, 5, 0, 5, 5, 5], dtype=float)
+    detector = InterpolationDetector(sequence_length=3)
+    closed = [detector.push(value) for value in v[:6]]
+    # the flat segment [5, 5, 5] closes as soon as 9 arrives
+    assert [len(segments) for segments in closed] == [0, 0, 0, 1, 0, 0]
+    closed.append(detector.push_many(v[6:]))
+    closed.append(detector.close())
+    segments = np.concatenate(closed)
+    assert np.array_equal(segments, detect_vector_interpolation(v, 3, output="segments")[1])
+
+
+def test_scan_vector_quality():
+    from pyutils.vectors import scan_vector_quality
+    v = np.array([1, 2, 3, 4, 5, 5, 5, 5, 5, 5, np.nan, np.nan, 7, 20, 21, 21])
+    report = scan_vector_quality(v, 4, step_threshold=5)
+    assert np.array_equal(report["interpolation"], detect_vector_interpolation(v, 4, output="segments")[1])
+    assert report["flatline"][["start", "end"]].tolist() == [(4, 10)]
+    assert report["repeated"][["start", "end"]].tolist() == [(4, 10), (14, 16)]
+    assert report["step_change"].tolist() == [(12, 14, 13.0)]
+    assert report["nan"][["start", "end"]].tolist() == [(10, 12)]
+
+
+def test_polars_expression_namespace():
+    import polars as pl
+    import pyutils  # noqa: F401 registers the namespace
+    lf = pl.LazyFrame({
+        "meter": ["a", "b"] * 5,
+        "value": [1.0, 9.0, 2.0, 1.0, 3.0, 9.0, 4.0, 1.0, 9.0, 9.0],
+    })
+    result = lf.with_columns(
+        pl.col("value").pyutils.interpolation_mask(sequence_length=3).over("meter").alias("mask")
+    ).collect()
+    assert result["mask"].to_list() == [True, False, True, False, True, False, True, False, False, False]
+    aggregated = lf.group_by("meter", maintain_order=True).agg(
+        pl.col("value").pyutils.interpolation_mask(sequence_length=3)
+    ).collect()
+    assert aggregated["value"].to_list() == [[True, True, True, True, False], [False] * 5]